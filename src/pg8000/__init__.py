@@ -1,3 +1,4 @@
+from pg8000.core import _version, connect_hosts
 from pg8000.legacy import (
     BIGINTEGER,
     BINARY,
@@ -59,7 +60,8 @@ from pg8000.legacy import (
     VARCHAR_ARRAY,
     Warning,
     XID,
-    __version__,
+    disable_scram_cache,
+    enable_scram_cache,
     pginterval_in,
     pginterval_out,
     timedelta_in,
@@ -108,21 +110,30 @@ def connect(
     application_name=None,
     replication=None,
     startup_params=None,
+    ssl_negotiation="postgres",
+    target_session_attrs="any",
+    connect_timeout=None,
 ):
-    return Connection(
-        user,
-        host=host,
-        database=database,
-        port=port,
-        password=password,
-        source_address=source_address,
-        unix_sock=unix_sock,
-        ssl_context=ssl_context,
-        timeout=timeout,
-        tcp_keepalive=tcp_keepalive,
-        application_name=application_name,
-        replication=replication,
-        startup_params=startup_params,
+    def make_connection(host, port, timeout):
+        return Connection(
+            user,
+            host=host,
+            database=database,
+            port=port,
+            password=password,
+            source_address=source_address,
+            unix_sock=unix_sock,
+            ssl_context=ssl_context,
+            timeout=timeout,
+            tcp_keepalive=tcp_keepalive,
+            application_name=application_name,
+            replication=replication,
+            startup_params=startup_params,
+            ssl_negotiation=ssl_negotiation,
+        )
+
+    return connect_hosts(
+        make_connection, host, port, timeout, target_session_attrs, connect_timeout
     )
 
 
@@ -146,6 +157,12 @@ This property is part of the `DBAPI 2.0 specification
 paramstyle = "format"
 
 
+def __getattr__(name):
+    if name == "__version__":
+        return _version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "BIGINTEGER",
     "BINARY",
@@ -209,6 +226,8 @@ __all__ = [
     "XID",
     "__version__",
     "connect",
+    "disable_scram_cache",
+    "enable_scram_cache",
     "pginterval_in",
     "pginterval_out",
     "timedelta_in",
@@ -1,3 +1,4 @@
+from binascii import unhexlify
 from datetime import (
     date as Date,
     datetime as Datetime,
@@ -19,8 +20,6 @@ from ipaddress import (
 from json import dumps, loads
 from uuid import UUID
 
-from dateutil.parser import ParserError, parse
-
 from pg8000.exceptions import InterfaceError
 from pg8000.types import PGInterval, Range
 
@@ -120,6 +119,10 @@ def bool_in(data):
     return data == "t"
 
 
+def bool_raw_in(data):
+    return data == b"t"
+
+
 def bool_out(v):
     return "true" if v else "false"
 
@@ -128,6 +131,10 @@ def bytes_in(data):
     return bytes.fromhex(data[2:])
 
 
+def bytes_raw_in(data):
+    return unhexlify(memoryview(data)[2:])
+
+
 def bytes_out(v):
     return "\\x" + v.hex()
 
@@ -266,6 +273,9 @@ def timestamp_in(data):
         pattern = "%Y-%m-%d %H:%M:%S.%f" if "." in data else "%Y-%m-%d %H:%M:%S"
         return Datetime.strptime(data, pattern)
     except ValueError:
+        # dateutil is slow to import, and is only needed for unusual timestamps
+        from dateutil.parser import ParserError, parse
+
         try:
             return parse(data)
         except ParserError:
@@ -281,6 +291,9 @@ def timestamptz_in(data):
         patt = "%Y-%m-%d %H:%M:%S.%f%z" if "." in data else "%Y-%m-%d %H:%M:%S%z"
         return Datetime.strptime(f"{data}00", patt)
     except ValueError:
+        # dateutil is slow to import, and is only needed for unusual timestamps
+        from dateutil.parser import ParserError, parse
+
         try:
             return parse(data)
         except ParserError:
@@ -563,6 +576,11 @@ def record_in(data):
     return tuple(results)
 
 
+# Input adapters that are passed the raw bytes of a value, rather than a str decoded
+# using the client encoding. An adapter can be added to this set if it accepts bytes.
+RAW_IN_FUNCS = {bool_raw_in, bytes_raw_in, float, int, vector_in}
+
+
 PY_PG = {
     Date: DATE,
     Decimal: NUMERIC,
@@ -614,9 +632,9 @@ PY_TYPES = {
 PG_TYPES = {
     BIGINT: int,  # int8
     BIGINT_ARRAY: int_array_in,  # int8[]
-    BOOLEAN: bool_in,  # bool
+    BOOLEAN: bool_raw_in,  # bool
     BOOLEAN_ARRAY: bool_array_in,  # bool[]
-    BYTES: bytes_in,  # bytea
+    BYTES: bytes_raw_in,  # bytea
     BYTES_ARRAY: bytes_array_in,  # bytea[]
     CHAR: string_in,  # char
     CHAR_ARRAY: string_array_in,  # char[]
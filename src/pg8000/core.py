@@ -1,25 +1,48 @@
 import codecs
+import mmap
 import socket
-from collections import defaultdict, deque
-from hashlib import md5
-from importlib.metadata import version
+from array import array
+from binascii import unhexlify
+from bisect import bisect_left
+from collections import Counter, OrderedDict, deque
+from collections.abc import Sequence
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from functools import cache
 from io import IOBase, TextIOBase
+from ipaddress import IPv4Address, IPv4Network, IPv6Address, IPv6Network
 from itertools import count
 from struct import Struct
-
-import scramp
+from time import perf_counter
+from types import MappingProxyType
+from uuid import UUID
+from weakref import WeakKeyDictionary
 
 from pg8000.converters import (
+    BYTES,
     PG_PY_ENCODINGS,
     PG_TYPES,
     PY_TYPES,
+    RAW_IN_FUNCS,
     make_params,
     string_in,
 )
 from pg8000.exceptions import DatabaseError, InterfaceError
 
 
-ver = version("pg8000")
+@cache
+def _version():
+    # importlib.metadata is slow to import, so the version is only looked up when it's
+    # needed
+    from importlib.metadata import version
+
+    return version("pg8000")
+
+
+def __getattr__(name):
+    if name == "ver":
+        return _version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def pack_funcs(fmt):
@@ -167,15 +190,32 @@ def _write(sock, d):
         raise InterfaceError("network error") from e
 
 
-def _make_socket(
-    unix_sock,
-    orig_sock,
-    host,
-    port,
-    timeout,
-    source_address,
-    tcp_keepalive,
-    orig_ssl_context,
+@cache
+def _default_ssl_context(alpn=False):
+    # Always the same context, so that TLS sessions can be resumed. Direct SSL
+    # negotiation has a context of its own with the ALPN protocol that it needs.
+    import ssl
+
+    ssl_context = ssl.create_default_context()
+    ssl_context.check_hostname = False
+    ssl_context.verify_mode = ssl.CERT_NONE
+    if alpn:
+        ssl_context.set_alpn_protocols(["postgresql"])
+    return ssl_context
+
+
+# TLS sessions that can be resumed by the next connection, keyed by SSL context and
+# then by (host, port)
+_tls_sessions = WeakKeyDictionary()
+
+
+def _save_tls_session(sock, host, port):
+    if sock.session is not None:
+        _tls_sessions.setdefault(sock.context, {})[(host, port)] = sock.session
+
+
+def _open_socket(
+    unix_sock, orig_sock, host, port, timeout, source_address, tcp_keepalive
 ):
     if unix_sock is not None:
         if orig_sock is not None:
@@ -214,41 +254,359 @@ def _make_socket(
     else:
         raise InterfaceError("one of host, sock or unix_sock must be provided")
 
+    return sock
+
+
+SSL_NEGOTIATIONS = ("postgres", "direct")
+
+
+def _make_socket(
+    unix_sock,
+    orig_sock,
+    host,
+    port,
+    timeout,
+    source_address,
+    tcp_keepalive,
+    orig_ssl_context,
+    ssl_negotiation="postgres",
+):
+    """Returns the channel binding, the socket, and how SSL was negotiated, which is
+    "direct", "postgres" or None if SSL isn't used.
+    """
+    if ssl_negotiation not in SSL_NEGOTIATIONS:
+        raise InterfaceError(
+            f"ssl_negotiation must be one of {SSL_NEGOTIATIONS}, not "
+            f"{ssl_negotiation!r}"
+        )
+    if ssl_negotiation == "direct" and orig_ssl_context is False:
+        raise InterfaceError("ssl_negotiation='direct' can't be used without SSL")
+
+    sock = _open_socket(
+        unix_sock, orig_sock, host, port, timeout, source_address, tcp_keepalive
+    )
+
     channel_binding = None
+    negotiation = None
     if orig_ssl_context is not False:
         try:
-            import ssl
-
             if orig_ssl_context is True or orig_ssl_context is None:
-                ssl_context = ssl.create_default_context()
-                ssl_context.check_hostname = False
-                ssl_context.verify_mode = ssl.CERT_NONE
+                ssl_context = _default_ssl_context(ssl_negotiation == "direct")
             else:
                 ssl_context = orig_ssl_context
+            session = _tls_sessions.get(ssl_context, {}).get((host, port))
+
+            if ssl_negotiation == "direct":
+                # The TLS handshake is started straight away, without an SSLRequest.
+                # Servers before PostgreSQL 17 don't support this, so if it fails a
+                # new socket is opened and an SSLRequest is sent as usual. The server
+                # requires the ALPN protocol, which has to be set on a context that's
+                # passed in.
+                try:
+                    sock = ssl_context.wrap_socket(
+                        sock, server_hostname=host, session=session
+                    )
+                    if sock.selected_alpn_protocol() != "postgresql":
+                        raise InterfaceError(
+                            "The server doesn't support direct SSL negotiation"
+                        )
+                    negotiation = "direct"
+                except (InterfaceError, OSError) as e:
+                    sock.close()
+                    if orig_sock is not None:
+                        raise InterfaceError(
+                            "Direct SSL negotiation failed, and a new socket can't "
+                            "be opened because the sock parameter was used."
+                        ) from e
+                    sock = _open_socket(
+                        unix_sock,
+                        orig_sock,
+                        host,
+                        port,
+                        timeout,
+                        source_address,
+                        tcp_keepalive,
+                    )
+
+            if negotiation is None:
+                # Int32(8) - Message length, including self.
+                # Int32(80877103) - The SSL request code.
+                sock.sendall(ii_pack(8, 80877103))
+                resp = sock.recv(1).decode("ascii")
+                if resp == "S":
+                    sock = ssl_context.wrap_socket(
+                        sock, server_hostname=host, session=session
+                    )
+                    negotiation = "postgres"
+                elif orig_ssl_context is not None:
+                    if sock is not None:
+                        sock.close()
+                    raise InterfaceError("Server refuses SSL")
+
+            if negotiation is not None:
+                import scramp
 
-            # Int32(8) - Message length, including self.
-            # Int32(80877103) - The SSL request code.
-            sock.sendall(ii_pack(8, 80877103))
-            resp = sock.recv(1).decode("ascii")
-            if resp == "S":
-                sock = ssl_context.wrap_socket(sock, server_hostname=host)
                 channel_binding = scramp.make_channel_binding(
                     "tls-server-end-point", sock
                 )
-            elif orig_ssl_context is not None:
-                if sock is not None:
-                    sock.close()
-                raise InterfaceError("Server refuses SSL")
 
         except ImportError:
             raise InterfaceError(
                 "SSL required but ssl module not available in this python "
                 "installation."
             )
-    return channel_binding, sock
+    return channel_binding, sock, negotiation
+
+
+# The SCRAM client and server keys that have been derived from passwords, or None if
+# they aren't being cached. They're keyed by (user, salt, iterations, hash name,
+# password hash).
+_scram_keys = None
+
+# When the cache reaches this size it's cleared
+SCRAM_CACHE_MAX_SIZE = 1024
+
+
+def enable_scram_cache():
+    """Caches the keys that are derived from a password for SCRAM-SHA-256
+    authentication. Deriving the keys is deliberately slow, and the cached keys are
+    used by any connection in the process that has the same user, password, salt and
+    iteration count.
+    """
+    global _scram_keys
+    if _scram_keys is None:
+        _scram_keys = {}
+
+
+def disable_scram_cache():
+    """Stops caching SCRAM keys, and removes the keys that have been cached."""
+    global _scram_keys
+    _scram_keys = None
+
+
+def _get_scram_keys(cache, user, password, hash_name, salt, iterations):
+    from hashlib import pbkdf2_hmac, sha256
+    from hmac import digest
+
+    key = (user, salt, iterations, hash_name, sha256(password).digest())
+    try:
+        return cache[key]
+    except KeyError:
+        pass
+
+    from scramp.core import saslprep
+
+    salted_password = pbkdf2_hmac(
+        hash_name, saslprep(password.decode("utf8")).encode("utf8"), salt, iterations
+    )
+    keys = (
+        digest(salted_password, b"Client Key", hash_name),
+        digest(salted_password, b"Server Key", hash_name),
+    )
+    if len(cache) >= SCRAM_CACHE_MAX_SIZE:
+        cache.clear()
+    cache[key] = keys
+    return keys
+
+
+def _scram_client_final(auth, cache, user, password, gs2_header, channel_binding):
+    """Returns the SCRAM client-final message and the server signature that's expected
+    in the server-final message, using the keys in the cache.
+    """
+    from base64 import b64encode
+    from hmac import digest
+
+    hash_name = auth.hf().name
+    client_key, server_key = _get_scram_keys(
+        cache, user, password, hash_name, bytes(auth.salt), int(auth.iterations)
+    )
+    cbind_input = gs2_header.encode("ascii")
+    if gs2_header.startswith("p="):
+        cbind_input += channel_binding[1]
+
+    without_proof = f"c={b64encode(cbind_input).decode('ascii')},r={auth.nonce}"
+    auth_message = ",".join(
+        (auth.client_first_bare, auth.server_first, without_proof)
+    ).encode("utf8")
+    stored_key = auth.hf(client_key).digest()
+    client_signature = digest(stored_key, auth_message, hash_name)
+    proof = bytes(a ^ b for a, b in zip(client_key, client_signature))
+    server_signature = digest(server_key, auth_message, hash_name)
+    return (
+        f"{without_proof},p={b64encode(proof).decode('ascii')}",
+        b64encode(server_signature).decode("ascii"),
+    )
+
+
+TARGET_SESSION_ATTRS = (
+    "any",
+    "read-write",
+    "read-only",
+    "primary",
+    "standby",
+    "prefer-standby",
+)
+
+
+def _session_attrs(con):
+    """Returns whether the server is a hot standby, and whether the session is
+    read-only. Servers from PostgreSQL 14 report these as parameter statuses, and
+    earlier servers are asked.
+    """
+    statuses = con.parameter_statuses
+    try:
+        hot_standby = statuses["in_hot_standby"] == "on"
+    except KeyError:
+        hot_standby = con.execute_simple("SELECT pg_is_in_recovery()").rows[0][0]
+
+    try:
+        read_only = statuses["default_transaction_read_only"] == "on"
+    except KeyError:
+        context = con.execute_simple("SHOW transaction_read_only")
+        read_only = context.rows[0][0] == "on"
+
+    return hot_standby, hot_standby or read_only
+
+
+def _session_matches(target_session_attrs, hot_standby, read_only):
+    if target_session_attrs == "read-write":
+        return not read_only
+    elif target_session_attrs == "read-only":
+        return read_only
+    elif target_session_attrs == "primary":
+        return not hot_standby
+    elif target_session_attrs == "standby":
+        return hot_standby
+    else:
+        return True
+
+
+def _close_probe(future):
+    if future.exception() is None:
+        con, _ = future.result()
+        try:
+            con.close()
+        except InterfaceError:
+            pass
+
+
+def connect_hosts(
+    connect,
+    host,
+    port,
+    timeout=None,
+    target_session_attrs="any",
+    connect_timeout=None,
+):
+    """Returns a connection to the first of the hosts that has the target session
+    attributes, where *host* is a host or a list of hosts, and *port* is a port or a
+    list with a port for each host. *connect* is called with (host, port, timeout) to
+    make each connection. The hosts are connected to in parallel, using
+    *connect_timeout* as the socket timeout until the connection is chosen.
+    """
+    if target_session_attrs not in TARGET_SESSION_ATTRS:
+        raise InterfaceError(
+            f"target_session_attrs must be one of {TARGET_SESSION_ATTRS}, not "
+            f"{target_session_attrs!r}"
+        )
+
+    if isinstance(host, (list, tuple)):
+        hosts = list(host)
+        ports = list(port) if isinstance(port, (list, tuple)) else [port] * len(hosts)
+        if len(ports) != len(hosts):
+            raise InterfaceError("There must be one port, or a port for each host")
+    elif target_session_attrs == "any" and connect_timeout is None:
+        return connect(host, port, timeout)
+    else:
+        hosts, ports = [host], [port]
+
+    def probe(host, port):
+        con = connect(
+            host, port, timeout if connect_timeout is None else connect_timeout
+        )
+        try:
+            attrs = None if target_session_attrs == "any" else _session_attrs(con)
+            if connect_timeout is not None:
+                con._usock.settimeout(timeout)
+        except BaseException:
+            con.close()
+            raise
+        return con, attrs
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    executor = ThreadPoolExecutor(max_workers=len(hosts))
+    futures = [executor.submit(probe, h, p) for h, p in zip(hosts, ports)]
+
+    if target_session_attrs == "prefer-standby":
+        passes = ("standby", "any")
+    else:
+        passes = (target_session_attrs,)
+
+    errors = {}
+    chosen = None
+    try:
+        for attrs in passes:
+            for h, p, future in zip(hosts, ports, futures):
+                try:
+                    con, session_attrs = future.result()
+                except Exception as e:
+                    errors[(h, p)] = e
+                    continue
+
+                if session_attrs is None or _session_matches(attrs, *session_attrs):
+                    chosen = future
+                    return con
+
+                errors[(h, p)] = f"doesn't match target_session_attrs {attrs!r}"
+    finally:
+        # The other probes aren't waited for, and their connections are closed as they
+        # finish
+        for future in futures:
+            if future is not chosen:
+                future.add_done_callback(_close_probe)
+        executor.shutdown(wait=False)
+
+    if len(hosts) == 1:
+        error = errors[(hosts[0], ports[0])]
+        if isinstance(error, Exception):
+            raise error
+
+    msgs = "; ".join(f"{h}:{p} {e}" for (h, p), e in errors.items())
+    cause = next((e for e in errors.values() if isinstance(e, Exception)), None)
+    raise InterfaceError(f"Can't connect to any of the hosts: {msgs}") from cause
+
+
+class _InAdapters(dict):
+    """Input adapters keyed by type OID, where a value of an unknown type is left as a
+    string.
+    """
+
+    def __missing__(self, oid):
+        return string_in
+
+
+# Read-only views of the default adapters, which connections share until they register
+# an adapter of their own
+SHARED_PG_TYPES = MappingProxyType(_InAdapters(PG_TYPES))
+SHARED_PY_TYPES = MappingProxyType(dict(PY_TYPES))
 
 
 class CoreConnection:
+    _commands_with_count = (
+        b"INSERT",
+        b"DELETE",
+        b"UPDATE",
+        b"MOVE",
+        b"FETCH",
+        b"COPY",
+        b"SELECT",
+    )
+    _listeners = ()
+    _notifications = None
+    _notices = None
+    _stream = None  # A RowStream whose rows haven't all been read
+
     def __enter__(self):
         return self
 
@@ -271,19 +629,9 @@ class CoreConnection:
         replication=None,
         startup_params=None,
         sock=None,
+        ssl_negotiation="postgres",
     ):
         self._client_encoding = "utf8"
-        self._commands_with_count = (
-            b"INSERT",
-            b"DELETE",
-            b"UPDATE",
-            b"MOVE",
-            b"FETCH",
-            b"COPY",
-            b"SELECT",
-        )
-        self.notifications = deque(maxlen=100)
-        self.notices = deque(maxlen=100)
         self.parameter_statuses = {}
 
         if user is None:
@@ -321,11 +669,19 @@ class CoreConnection:
             self.password = password
 
         self._xid = None
+
+        # The number of transactions, explicit or implicit, that have ended, so that
+        # objects that only last as long as a transaction can tell if theirs has ended
+        self._transactions_ended = 0
+
         self._statement_nums = set()
+        self._portal_nums = set()
+        self._closed_portals = []
 
         self._caches = {}
+        self.stats = None
 
-        self.channel_binding, self._usock = _make_socket(
+        self.channel_binding, self._usock, self.ssl_negotiation = _make_socket(
             unix_sock,
             sock,
             host,
@@ -334,38 +690,16 @@ class CoreConnection:
             source_address,
             tcp_keepalive,
             ssl_context,
+            ssl_negotiation,
         )
 
         self._sock = self._usock.makefile(mode="rwb")
 
         self._backend_key_data = None
 
-        self.pg_types = defaultdict(lambda: string_in, PG_TYPES)
-        self.py_types = dict(PY_TYPES)
-
-        self.message_types = {
-            NOTICE_RESPONSE: self.handle_NOTICE_RESPONSE,
-            AUTHENTICATION_REQUEST: self.handle_AUTHENTICATION_REQUEST,
-            PARAMETER_STATUS: self.handle_PARAMETER_STATUS,
-            BACKEND_KEY_DATA: self.handle_BACKEND_KEY_DATA,
-            READY_FOR_QUERY: self.handle_READY_FOR_QUERY,
-            ROW_DESCRIPTION: self.handle_ROW_DESCRIPTION,
-            ERROR_RESPONSE: self.handle_ERROR_RESPONSE,
-            EMPTY_QUERY_RESPONSE: self.handle_EMPTY_QUERY_RESPONSE,
-            DATA_ROW: self.handle_DATA_ROW,
-            COMMAND_COMPLETE: self.handle_COMMAND_COMPLETE,
-            PARSE_COMPLETE: self.handle_PARSE_COMPLETE,
-            BIND_COMPLETE: self.handle_BIND_COMPLETE,
-            CLOSE_COMPLETE: self.handle_CLOSE_COMPLETE,
-            PORTAL_SUSPENDED: self.handle_PORTAL_SUSPENDED,
-            NO_DATA: self.handle_NO_DATA,
-            PARAMETER_DESCRIPTION: self.handle_PARAMETER_DESCRIPTION,
-            NOTIFICATION_RESPONSE: self.handle_NOTIFICATION_RESPONSE,
-            COPY_DONE: self.handle_COPY_DONE,
-            COPY_DATA: self.handle_COPY_DATA,
-            COPY_IN_RESPONSE: self.handle_COPY_IN_RESPONSE,
-            COPY_OUT_RESPONSE: self.handle_COPY_OUT_RESPONSE,
-        }
+        # The adapters are shared with other connections until one is registered
+        self.pg_types = SHARED_PG_TYPES
+        self.py_types = SHARED_PY_TYPES
 
         # Int32 - Message length, including self.
         # Int32(196608) - Protocol version number.  Version 3.0.
@@ -388,7 +722,7 @@ class CoreConnection:
             while code not in (READY_FOR_QUERY, ERROR_RESPONSE):
                 code, data_len = ci_unpack(_read(self._sock, 5))
 
-                self.message_types[code](_read(self._sock, data_len - 4), context)
+                self.message_types[code](self, _read(self._sock, data_len - 4), context)
 
             if context.error is not None:
                 raise context.error
@@ -399,10 +733,77 @@ class CoreConnection:
 
         self._transaction_status = None
 
+        # None if the connection doesn't use TLS
+        self.tls_session_reused = getattr(self._usock, "session_reused", None)
+        if self.tls_session_reused is not None:
+            # By now any session ticket sent after the TLS handshake has been received
+            _save_tls_session(self._usock, host, port)
+
+    def enable_stats(self):
+        """Starts collecting statistics for this connection, and returns the
+        :class:`Stats` object that they're collected in. If statistics are already
+        being collected, the existing :class:`Stats` object is returned.
+        """
+        if self.stats is None:
+            stats = Stats()
+            self._sock = _StatsSocket(self._sock, stats)
+            self.message_types = {
+                code: _count_message(code, handler, stats)
+                for code, handler in self.message_types.items()
+            }
+            self.stats = stats
+        return self.stats
+
+    def disable_stats(self):
+        """Stops collecting statistics for this connection."""
+        if self.stats is not None:
+            if self._sock is not None:
+                self._sock = self._sock.sock
+            del self.message_types
+            self.stats = None
+
+    def add_listener(self, listener):
+        """Adds a listener that's called at points in the lifecycle of each query. The
+        listener can have any of the methods:
+
+        - ``query_start(statement, param_count)``
+        - ``first_byte(statement, seconds)`` - when the first byte of the results
+          arrives, with the seconds since the start of the query
+        - ``rows_decoded(statement, num_rows)``
+        - ``query_end(statement, row_count, timings)``
+        - ``query_error(statement, error, timings)``
+
+        where ``timings`` is a ``dict`` of phase (``parse``, ``describe``, ``execute``
+        and ``total``) to seconds. An exception raised by a listener is raised once the
+        response to the query has been read.
+        """
+        self._listeners = self._listeners + (listener,)
+
+    def remove_listener(self, listener):
+        listeners = list(self._listeners)
+        listeners.remove(listener)
+        self._listeners = tuple(listeners)
+
+    @property
+    def notifications(self):
+        if self._notifications is None:
+            self._notifications = deque(maxlen=100)
+        return self._notifications
+
+    @property
+    def notices(self):
+        if self._notices is None:
+            self._notices = deque(maxlen=100)
+        return self._notices
+
     def register_out_adapter(self, typ, out_func):
+        if self.py_types is SHARED_PY_TYPES:
+            self.py_types = dict(SHARED_PY_TYPES)
         self.py_types[typ] = out_func
 
     def register_in_adapter(self, oid, in_func):
+        if self.pg_types is SHARED_PG_TYPES:
+            self.pg_types = _InAdapters(SHARED_PG_TYPES)
         self.pg_types[oid] = in_func
 
     def handle_ERROR_RESPONSE(self, data, context):
@@ -429,7 +830,7 @@ class CoreConnection:
         pass
 
     def handle_PORTAL_SUSPENDED(self, data, context):
-        pass
+        context.suspended = True
 
     def handle_PARAMETER_DESCRIPTION(self, data, context):
         """https://www.postgresql.org/docs/current/protocol-message-formats.html"""
@@ -580,6 +981,8 @@ class CoreConnection:
             _flush(self._sock)
 
         elif auth_code == 5:
+            from hashlib import md5
+
             salt = b"".join(cccc_unpack(data, 4))
             if self.password is None:
                 raise InterfaceError(
@@ -594,6 +997,8 @@ class CoreConnection:
 
         elif auth_code == 10:
             # AuthenticationSASL
+            import scramp
+
             mechanisms = [m.decode("ascii") for m in data[4:-2].split(NULL_BYTE)]
 
             self.auth = scramp.ScramClient(
@@ -603,7 +1008,9 @@ class CoreConnection:
                 channel_binding=self.channel_binding,
             )
 
-            init = self.auth.get_client_first().encode("utf8")
+            client_first = self.auth.get_client_first()
+            self._scram_gs2_header = client_first[: -len(self.auth.client_first_bare)]
+            init = client_first.encode("utf8")
             mech = self.auth.mechanism_name.encode("ascii") + NULL_BYTE
 
             # SASLInitialResponse
@@ -614,14 +1021,38 @@ class CoreConnection:
             # AuthenticationSASLContinue
             self.auth.set_server_first(data[4:].decode("utf8"))
 
+            cache = _scram_keys
+            if cache is None:
+                msg = self.auth.get_client_final()
+                self._scram_server_signature = None
+            else:
+                msg, self._scram_server_signature = _scram_client_final(
+                    self.auth,
+                    cache,
+                    self.user,
+                    self.password,
+                    self._scram_gs2_header,
+                    self.channel_binding,
+                )
+
             # SASLResponse
-            msg = self.auth.get_client_final().encode("utf8")
-            self._send_message(PASSWORD, msg)
+            self._send_message(PASSWORD, msg.encode("utf8"))
             _flush(self._sock)
 
         elif auth_code == 12:
             # AuthenticationSASLFinal
-            self.auth.set_server_final(data[4:].decode("utf8"))
+            server_final = data[4:].decode("utf8")
+            if self._scram_server_signature is None:
+                self.auth.set_server_final(server_final)
+            else:
+                from hmac import compare_digest
+
+                if not compare_digest(
+                    server_final, f"v={self._scram_server_signature}"
+                ):
+                    raise InterfaceError(
+                        f"The server signature doesn't match: {server_final}"
+                    )
 
         elif auth_code in (2, 4, 6, 7, 8, 9):
             raise InterfaceError(
@@ -633,6 +1064,8 @@ class CoreConnection:
             )
 
     def handle_READY_FOR_QUERY(self, data, context):
+        if data == IDLE:
+            self._transactions_ended += 1
         self._transaction_status = data
 
     def handle_BACKEND_KEY_DATA(self, data, context):
@@ -662,12 +1095,17 @@ class CoreConnection:
             field["name"] = name.decode(self._client_encoding)
             idx += 18
             columns.append(field)
-            input_funcs.append(self.pg_types[field["type_oid"]])
+            input_funcs.append(self.pg_types.get(field["type_oid"], string_in))
 
         context.columns = columns
         context.input_funcs = input_funcs
+        if context.memo:
+            _memoize_input_funcs(context, self._client_encoding)
         if context.rows is None:
-            context.rows = []
+            context.rows = [] if context.spill is None else SpilledRows(context.spill)
+        if context._results is not None:
+            context._result_columns = columns
+            context._result_start = len(context.rows)
 
     def send_PARSE(self, statement_name_bin, statement, oids=()):
         val = bytearray(statement_name_bin)
@@ -686,22 +1124,109 @@ class CoreConnection:
     def send_QUERY(self, sql):
         self._send_message(QUERY, sql.encode(self._client_encoding) + NULL_BYTE)
 
-    def execute_simple(self, statement):
-        context = Context(statement)
+    def _send_begin(self):
+        # Sends a BEGIN to be flushed along with the first statement of a
+        # transaction, saving a round trip
+        self.send_QUERY("begin transaction")
+        return Context("begin transaction")
 
-        self.send_QUERY(statement)
-        _flush(self._sock)
-        self.handle_messages(context)
+    def _handle_begin(self, begin_context, context):
+        try:
+            self.handle_messages(begin_context)
+        except DatabaseError:
+            # The response to the statement is still to be read, but it's the error
+            # of the BEGIN that's raised
+            try:
+                self.handle_messages(context)
+            except DatabaseError:
+                pass
+            raise
 
+    def execute_simple(
+        self, statement, lazy=False, memo=None, spill=None, begin=False, sinks=None
+    ):
+        context = Context(statement, lazy=lazy, memo=memo, spill=spill, sinks=sinks)
+        listening = len(self._listeners) > 0
+        if listening or self.stats is not None:
+            context.start_timing()
+        if listening:
+            self._notify(context, "query_start", statement, 0)
+
+        context._results = []
+
+        try:
+            begin_context = self._send_begin() if begin else None
+            self.send_QUERY(statement)
+            _flush(self._sock)
+            if begin_context is not None:
+                self._handle_begin(begin_context, context)
+            context.first_byte_pending = listening
+            self.handle_messages(context)
+            context.end_phase("execute")
+        except BaseException as e:
+            if listening:
+                self._query_error(context, e)
+            raise
+
+        if listening or self.stats is not None:
+            self._query_end(context)
+        if context.listener_error is not None:
+            raise context.listener_error
         return context
 
-    def execute_unnamed(self, statement, vals=(), oids=(), stream=None):
-        context = Context(statement, stream=stream)
+    def execute_unnamed(
+        self,
+        statement,
+        vals=(),
+        oids=(),
+        stream=None,
+        lazy=False,
+        memo=None,
+        spill=None,
+        begin=False,
+        sinks=None,
+    ):
+        context = Context(
+            statement,
+            stream=stream,
+            lazy=lazy,
+            memo=memo,
+            spill=spill,
+            sinks=sinks,
+        )
+        listening = len(self._listeners) > 0
+        if listening or self.stats is not None:
+            context.start_timing()
+        if listening:
+            self._notify(context, "query_start", statement, len(vals))
 
+        try:
+            self._send_unnamed(context, statement, vals, oids, begin)
+            context.first_byte_pending = listening
+            self.handle_messages(context)
+            context.end_phase("execute")
+        except BaseException as e:
+            if listening:
+                self._query_error(context, e)
+            raise
+
+        if listening or self.stats is not None:
+            self._query_end(context)
+        if context.listener_error is not None:
+            raise context.listener_error
+        return context
+
+    def _send_unnamed(self, context, statement, vals, oids, begin=False):
+        # Parses the statement and binds the parameters, and then sends the Execute
+        # without reading the response
+        begin_context = self._send_begin() if begin else None
         self.send_PARSE(NULL_BYTE, statement, oids)
         _write(self._sock, SYNC_MSG)
         _flush(self._sock)
+        if begin_context is not None:
+            self._handle_begin(begin_context, context)
         self.handle_messages(context)
+        context.end_phase("parse")
         self.send_DESCRIBE_STATEMENT(NULL_BYTE)
 
         _write(self._sock, SYNC_MSG)
@@ -716,13 +1241,83 @@ class CoreConnection:
         params = make_params(self.py_types, vals)
         self.send_BIND(NULL_BYTE, params)
         self.handle_messages(context)
+        context.end_phase("describe")
         self.send_EXECUTE()
 
         _write(self._sock, SYNC_MSG)
         _flush(self._sock)
-        self.handle_messages(context)
 
-        return context
+    def execute_stream(self, statement, vals=None, oids=(), lazy=False, memo=None):
+        """Sends the statement, and returns a RowStream of the rows of the result.
+        If ``vals`` is ``None`` then it's sent as a simple query, and so it can have
+        more than one statement.
+        """
+        context = Context(statement, lazy=lazy, memo=memo)
+        if vals is None:
+            self.send_QUERY(statement)
+            _flush(self._sock)
+        else:
+            self._send_unnamed(context, statement, vals, oids)
+        self._stream = RowStream(self, context)
+        return self._stream
+
+    def _next_row(self, context):
+        # Reads messages up to the next DataRow and returns its row, or returns None
+        # once the ReadyForQuery has been read
+        code = None
+        while code != READY_FOR_QUERY:
+            code, data_len = ci_unpack(_read(self._sock, 5))
+            self.message_types[code](self, _read(self._sock, data_len - 4), context)
+            if code == DATA_ROW:
+                return context.rows.pop()
+        return None
+
+    def execute_portal(
+        self, statement, vals=(), oids=(), batch_size=1000, lazy=False, memo=None
+    ):
+        """Binds the statement to a portal of its own, and returns a Portal that
+        fetches the rows ``batch_size`` at a time. The first batch is fetched along
+        with the bind. A portal only lasts until the end of the transaction, and so
+        the connection has to be in a transaction.
+        """
+        if self._transaction_status != IN_TRANSACTION:
+            raise InterfaceError("A portal can only be used in a transaction")
+
+        # Portals that have been closed are closed on the server along with the bind,
+        # and then their names can be used again
+        for name_bin in self._closed_portals:
+            self._send_message(CLOSE, PORTAL + name_bin)
+            self._portal_nums.discard(name_bin)
+        self._closed_portals.clear()
+
+        for i in count():
+            portal_name_bin = f"pg8000_portal_{i}".encode("ascii") + NULL_BYTE
+            if portal_name_bin not in self._portal_nums:
+                break
+
+        context = Context(statement, lazy=lazy, memo=memo)
+        self.send_PARSE(NULL_BYTE, statement, oids)
+        self.send_BIND(NULL_BYTE, make_params(self.py_types, vals), portal_name_bin)
+        self.send_DESCRIBE_PORTAL(portal_name_bin)
+        self.send_EXECUTE(portal_name_bin, batch_size)
+        _write(self._sock, SYNC_MSG)
+        _flush(self._sock)
+        self._portal_nums.add(portal_name_bin)
+        portal = Portal(self, portal_name_bin, context, batch_size)
+        try:
+            self.handle_messages(context)
+        except BaseException:
+            portal._end()
+            raise
+        return portal
+
+    def _fetch_portal(self, portal_name_bin, context, batch_size):
+        context.rows = []
+        context.suspended = False
+        self.send_EXECUTE(portal_name_bin, batch_size)
+        _write(self._sock, SYNC_MSG)
+        _flush(self._sock)
+        self.handle_messages(context)
 
     def prepare_statement(self, statement, oids=None):
         for i in count():
@@ -750,18 +1345,171 @@ class CoreConnection:
         return statement_name_bin, context.columns, context.input_funcs
 
     def execute_named(
-        self, statement_name_bin, params, columns, input_funcs, statement
+        self,
+        statement_name_bin,
+        params,
+        columns,
+        input_funcs,
+        statement,
+        lazy=False,
+        memo=None,
+        spill=None,
+        begin=False,
+        sinks=None,
     ):
-        context = Context(columns=columns, input_funcs=input_funcs, statement=statement)
+        context = Context(
+            columns=columns,
+            input_funcs=input_funcs,
+            statement=statement,
+            lazy=lazy,
+            memo=memo,
+            spill=spill,
+            sinks=sinks,
+        )
+        if memo:
+            _memoize_input_funcs(context, self._client_encoding)
+        listening = len(self._listeners) > 0
+        if listening or self.stats is not None:
+            context.start_timing()
+        if listening:
+            self._notify(context, "query_start", statement, len(params))
 
-        self.send_BIND(statement_name_bin, params)
-        self.send_EXECUTE()
-        _write(self._sock, SYNC_MSG)
-        _flush(self._sock)
-        self.handle_messages(context)
+        try:
+            # The Bind and Execute are sent together, so the execute phase includes
+            # the bind
+            begin_context = self._send_begin() if begin else None
+            self.send_BIND(statement_name_bin, params)
+            self.send_EXECUTE()
+            _write(self._sock, SYNC_MSG)
+            _flush(self._sock)
+            if begin_context is not None:
+                self._handle_begin(begin_context, context)
+            context.first_byte_pending = listening
+            self.handle_messages(context)
+            context.end_phase("execute")
+        except BaseException as e:
+            if listening:
+                self._query_error(context, e)
+            raise
+
+        if listening or self.stats is not None:
+            self._query_end(context)
+        if context.listener_error is not None:
+            raise context.listener_error
         return context
 
+    def send_DESCRIBE_PORTAL(self, portal_name_bin):
+        self._send_message(DESCRIBE, PORTAL + portal_name_bin)
+        _write(self._sock, FLUSH_MSG)
+
+    def execute_pipeline(self, groups, begin=False):
+        """Sends the statements of a pipeline in one go, and then reads the results.
+        Each group is a list of (context, params, oids) and ends with a Sync, so an
+        error in a statement means the rest of its group is skipped. If ``begin`` is
+        ``True`` then a BEGIN is sent at the start of the first group.
+        """
+        if begin:
+            groups[0].insert(0, (Context("begin transaction"), (), ()))
+
+        listening = len(self._listeners) > 0
+        timing = listening or self.stats is not None
+        for group in groups:
+            for context, params, oids in group:
+                if timing:
+                    context.start_timing()
+                if listening:
+                    self._notify(context, "query_start", context.statement, len(params))
+                self.send_PARSE(NULL_BYTE, context.statement, oids)
+                self.send_BIND(NULL_BYTE, params)
+                self.send_DESCRIBE_PORTAL(NULL_BYTE)
+                self.send_EXECUTE()
+            _write(self._sock, SYNC_MSG)
+        _flush(self._sock)
+
+        for group in groups:
+            self._handle_pipeline_group([context for context, _, _ in group])
+
+        for group in groups:
+            for context, _, _ in group:
+                if context.error is not None:
+                    raise context.error
+
+        for group in groups:
+            for context, _, _ in group:
+                if context.listener_error is not None:
+                    raise context.listener_error
+
+    def _handle_pipeline_group(self, contexts):
+        # Messages that come after the last statement, such as the ReadyForQuery,
+        # are handled with a context of their own
+        contexts = iter(contexts)
+        context = next(contexts)
+        listening = len(self._listeners) > 0
+        code = None
+        while code != READY_FOR_QUERY:
+            code, data_len = ci_unpack(_read(self._sock, 5))
+            self.message_types[code](self, _read(self._sock, data_len - 4), context)
+
+            if code in (COMMAND_COMPLETE, EMPTY_QUERY_RESPONSE, ERROR_RESPONSE):
+                if context.error is None:
+                    if listening or self.stats is not None:
+                        self._query_end(context)
+                else:
+                    if listening:
+                        self._query_error(context, context.error)
+                    if code == ERROR_RESPONSE:
+                        for skipped in contexts:
+                            skipped.error = InterfaceError(
+                                "Skipped because of an error in an earlier "
+                                "statement of the pipeline"
+                            )
+                context = next(contexts, Context(None))
+
+    def _query_end(self, context):
+        statement = context.statement
+        latency = perf_counter() - context.start
+        if self.stats is not None:
+            self.stats.add_latency(statement, latency)
+
+        if len(self._listeners) > 0:
+            context.timings["total"] = latency
+            rows = context.rows
+            num_rows = 0 if rows is None else len(rows)
+            self._notify(context, "rows_decoded", statement, num_rows)
+            self._notify(
+                context, "query_end", statement, context.row_count, context.timings
+            )
+
+    def _query_error(self, context, error):
+        context.timings["total"] = perf_counter() - context.start
+        self._notify(context, "query_error", context.statement, error, context.timings)
+
+    def _first_byte(self, context):
+        context.first_byte_pending = False
+        try:
+            self._sock.peek(1)
+        except OSError as e:
+            raise InterfaceError("network error") from e
+        seconds = perf_counter() - context.start
+        self._notify(context, "first_byte", context.statement, seconds)
+
+    def _notify(self, context, event, *args):
+        # An exception raised by a listener is kept, and raised once the response has
+        # been read, so that the connection stays in step with the server
+        for listener in self._listeners:
+            handler = getattr(listener, event, None)
+            if handler is not None:
+                try:
+                    handler(*args)
+                except Exception as e:
+                    if context.listener_error is None:
+                        context.listener_error = e
+
     def _send_message(self, code, data):
+        if self._stream is not None:
+            # The rest of an unfinished stream has to be read before anything else
+            self._stream._drain()
+
         buff = bytearray(code)
         buff.extend(i_pack(len(data) + 4))
         buff.extend(data)
@@ -775,11 +1523,11 @@ class CoreConnection:
         except AttributeError:
             raise InterfaceError("connection is closed")
 
-    def send_BIND(self, statement_name_bin, params):
+    def send_BIND(self, statement_name_bin, params, portal_name_bin=NULL_BYTE):
         """https://www.postgresql.org/docs/current/protocol-message-formats.html"""
 
         retval = bytearray(
-            NULL_BYTE + statement_name_bin + H_pack(0) + H_pack(len(params))
+            portal_name_bin + statement_name_bin + H_pack(0) + H_pack(len(params))
         )
 
         for value in params:
@@ -794,9 +1542,12 @@ class CoreConnection:
         self._send_message(BIND, retval)
         _write(self._sock, FLUSH_MSG)
 
-    def send_EXECUTE(self):
+    def send_EXECUTE(self, portal_name_bin=NULL_BYTE, max_rows=0):
         """https://www.postgresql.org/docs/current/protocol-message-formats.html"""
-        _write(self._sock, EXECUTE_MSG)
+        if portal_name_bin == NULL_BYTE and max_rows == 0:
+            _write(self._sock, EXECUTE_MSG)
+        else:
+            self._send_message(EXECUTE, portal_name_bin + i_pack(max_rows))
         _write(self._sock, FLUSH_MSG)
 
     def handle_NO_DATA(self, msg, context):
@@ -816,33 +1567,128 @@ class CoreConnection:
             else:
                 context.row_count += row_count
         except ValueError:
-            pass
+            row_count = -1
+
+        results = context._results
+        if results is not None:
+            columns = context._result_columns
+            if columns is None:
+                rows = None
+            else:
+                all_rows = context.rows
+                rows = ResultRows(all_rows, context._result_start, len(all_rows))
+            results.append(Result(columns, rows, row_count))
+            context._result_columns = None
 
     def handle_DATA_ROW(self, data, context):
+        if context.spill is not None and context.rows.spill(
+            data, context, self._client_encoding
+        ):
+            return
+
+        if context.lazy:
+            context.rows.append(
+                LazyRow(
+                    data, context.input_funcs, context.raw_inputs, self._client_encoding
+                )
+            )
+            return
+
         idx = 2
         row = []
-        for func in context.input_funcs:
+        encoding = self._client_encoding
+        for func, raw in zip(context.input_funcs, context.raw_inputs):
             vlen = i_unpack(data, idx)[0]
             idx += 4
             if vlen == -1:
                 v = None
+            elif raw:
+                v = func(data[idx : idx + vlen])
+                idx += vlen
             else:
-                v = func(str(data[idx : idx + vlen], encoding=self._client_encoding))
+                v = func(data[idx : idx + vlen].decode(encoding))
                 idx += vlen
             row.append(v)
         context.rows.append(row)
 
     def handle_messages(self, context):
+        if context.first_byte_pending:
+            self._first_byte(context)
+
         code = None
+        sinks = context.sinks
 
         while code != READY_FOR_QUERY:
             code, data_len = ci_unpack(_read(self._sock, 5))
 
-            self.message_types[code](_read(self._sock, data_len - 4), context)
+            if sinks is not None and code == DATA_ROW:
+                stats = self.stats
+                if stats is None:
+                    self._stream_DATA_ROW(context)
+                else:
+                    start = perf_counter()
+                    self._stream_DATA_ROW(context)
+                    stats.message_times[DATA_ROW] += perf_counter() - start
+                    stats.messages[DATA_ROW] += 1
+            else:
+                self.message_types[code](self, _read(self._sock, data_len - 4), context)
 
         if context.error is not None:
             raise context.error
 
+    def _stream_DATA_ROW(self, context):
+        # Reads a DataRow message a value at a time, so that the values of columns
+        # with sinks can be written to them in chunks, rather than being read whole
+        if context._sink_columns is not context.columns:
+            context._sink_columns = context.columns
+            context._sink_idxs = {}
+            for idx, column in enumerate(context.columns):
+                sink = context.sinks.get(column["name"])
+                if sink is not None:
+                    context._sink_idxs[idx] = (sink, column["type_oid"] == BYTES)
+
+        sock = self._sock
+        encoding = self._client_encoding
+        sink_idxs = context._sink_idxs
+        row = []
+        _read(sock, 2)
+        for idx, (func, raw) in enumerate(zip(context.input_funcs, context.raw_inputs)):
+            vlen = i_unpack(_read(sock, 4))[0]
+            if vlen == -1:
+                v = None
+            elif idx in sink_idxs:
+                v = self._stream_value(vlen, *sink_idxs[idx], context)
+            elif raw:
+                v = func(_read(sock, vlen))
+            else:
+                v = func(_read(sock, vlen).decode(encoding))
+            row.append(v)
+        context.rows.append(row)
+
+    def _stream_value(self, vlen, sink, is_hex, context):
+        # Returns the number of bytes written to the sink. If the sink raises an
+        # exception, the rest of the value is still read so that the connection
+        # stays in step with the server, and the exception is raised at the end.
+        sock = self._sock
+        remaining = vlen
+        if is_hex:
+            _read(sock, 2)  # The \x prefix
+            remaining -= 2
+
+        written = 0
+        while remaining > 0:
+            chunk = _read(sock, min(remaining, SINK_CHUNK_SIZE))
+            remaining -= len(chunk)
+            if is_hex:
+                chunk = unhexlify(chunk)
+            if context.error is None:
+                try:
+                    sink.write(chunk)
+                except Exception as e:
+                    context.error = e
+            written += len(chunk)
+        return written
+
     def close_prepared_statement(self, statement_name_bin):
         """https://www.postgresql.org/docs/current/protocol-message-formats.html"""
         self._send_message(CLOSE, STATEMENT + statement_name_bin)
@@ -877,13 +1723,800 @@ class CoreConnection:
         elif key == "server_version":
             pass
 
+    # The name of the method that handles each kind of message
+    message_handlers = {
+        NOTICE_RESPONSE: "handle_NOTICE_RESPONSE",
+        AUTHENTICATION_REQUEST: "handle_AUTHENTICATION_REQUEST",
+        PARAMETER_STATUS: "handle_PARAMETER_STATUS",
+        BACKEND_KEY_DATA: "handle_BACKEND_KEY_DATA",
+        READY_FOR_QUERY: "handle_READY_FOR_QUERY",
+        ROW_DESCRIPTION: "handle_ROW_DESCRIPTION",
+        ERROR_RESPONSE: "handle_ERROR_RESPONSE",
+        EMPTY_QUERY_RESPONSE: "handle_EMPTY_QUERY_RESPONSE",
+        DATA_ROW: "handle_DATA_ROW",
+        COMMAND_COMPLETE: "handle_COMMAND_COMPLETE",
+        PARSE_COMPLETE: "handle_PARSE_COMPLETE",
+        BIND_COMPLETE: "handle_BIND_COMPLETE",
+        CLOSE_COMPLETE: "handle_CLOSE_COMPLETE",
+        PORTAL_SUSPENDED: "handle_PORTAL_SUSPENDED",
+        NO_DATA: "handle_NO_DATA",
+        PARAMETER_DESCRIPTION: "handle_PARAMETER_DESCRIPTION",
+        NOTIFICATION_RESPONSE: "handle_NOTIFICATION_RESPONSE",
+        COPY_DONE: "handle_COPY_DONE",
+        COPY_DATA: "handle_COPY_DATA",
+        COPY_IN_RESPONSE: "handle_COPY_IN_RESPONSE",
+        COPY_OUT_RESPONSE: "handle_COPY_OUT_RESPONSE",
+    }
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.message_types = _make_message_types(cls)
+
+
+def _make_message_types(cls):
+    # Shared by all connections of a class, the handlers are called with the
+    # connection as the first argument. They're looked up by name so that a subclass
+    # can override them.
+    return {code: getattr(cls, name) for code, name in cls.message_handlers.items()}
+
+
+CoreConnection.message_types = _make_message_types(CoreConnection)
+
+
+def _is_raw_in_func(func):
+    try:
+        return func in RAW_IN_FUNCS
+    except TypeError:  # An unhashable callable
+        return False
+
+
+# The number of bytes of a value that are read at a time and written to its sink. It's
+# even so that hex digits are decoded in pairs.
+SINK_CHUNK_SIZE = 64 * 1024
+
+# A memoized column keeps at most this many distinct values
+MEMO_MAX_SIZE = 1024
+
+# Every time this many values have been looked up in a memoized column, the hit rate is
+# checked, and if it's below MEMO_MIN_HIT_RATE the memoization is turned off.
+MEMO_SAMPLE_SIZE = 1000
+MEMO_MIN_HIT_RATE = 0.5
+
+# The types of values that can be shared between rows. Being hashable isn't enough, as
+# an object returned by a user's adapter can be hashable and still be mutable.
+MEMO_TYPES = frozenset(
+    (
+        type(None),
+        bool,
+        int,
+        float,
+        Decimal,
+        str,
+        bytes,
+        date,
+        time,
+        datetime,
+        timedelta,
+        UUID,
+        IPv4Address,
+        IPv4Network,
+        IPv6Address,
+        IPv6Network,
+    )
+)
+
+
+def _is_immutable(v):
+    t = type(v)
+    if t is tuple:
+        return all(_is_immutable(e) for e in v)
+    return t in MEMO_TYPES
+
+
+def _memoize(func, raw, encoding):
+    cache = {}
+    lookups = hits = 0
+    enabled = True
+
+    def memo_in(data):
+        nonlocal lookups, hits, enabled
+
+        if enabled:
+            lookups += 1
+            try:
+                v = cache[data]
+                hits += 1
+                return v
+            except KeyError:
+                pass
+
+        v = func(data) if raw else func(data.decode(encoding))
+
+        if enabled:
+            # Only immutable values can be shared between rows
+            if not _is_immutable(v):
+                enabled = False
+            else:
+                if len(cache) < MEMO_MAX_SIZE:
+                    cache[data] = v
+                if lookups % MEMO_SAMPLE_SIZE == 0 and hits < (
+                    lookups * MEMO_MIN_HIT_RATE
+                ):
+                    enabled = False
+
+            if not enabled:
+                cache.clear()
+
+        return v
+
+    return memo_in
+
+
+def _memoize_input_funcs(context, encoding):
+    memo = context.memo
+    input_funcs = []
+    raw_inputs = []
+    for col, func, raw in zip(context.columns, context.input_funcs, context.raw_inputs):
+        if memo is True or col["name"] in memo:
+            input_funcs.append(_memoize(func, raw, encoding))
+            raw_inputs.append(True)
+        else:
+            input_funcs.append(func)
+            raw_inputs.append(raw)
+
+    context.input_funcs = input_funcs
+    context.raw_inputs = raw_inputs
+
+
+# The upper bounds in seconds of the buckets of the statement latency histograms.
+# There's also a final bucket for latencies greater than the last bound.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10)
+
+# The number of statements that Stats keeps latencies for, dropping the least recently
+# executed statement to make room for a new one
+MAX_LATENCY_STATEMENTS = 1000
+
+
+class Stats:
+    """Counters and timings for a connection.
+
+    The time spent converting rows is the time spent handling DataRow messages, so it
+    doesn't include values that are converted later on, for example with
+    ``lazy=True``.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.round_trips = 0
+
+        # Number of messages received, and seconds spent handling them, by message code
+        self.messages = Counter()
+        self.message_times = Counter()
+
+        # Seconds spent waiting on the socket
+        self.socket_time = 0
+
+        # For each of the most recently executed statements, the number of executions
+        # falling into each of the LATENCY_BUCKETS
+        self.latencies = OrderedDict()
+
+    @property
+    def rows(self):
+        """Number of rows received."""
+        return self.messages[DATA_ROW]
+
+    @property
+    def converter_time(self):
+        """Seconds spent converting rows."""
+        return self.message_times[DATA_ROW]
+
+    def add_latency(self, statement, latency):
+        latencies = self.latencies
+        try:
+            histogram = latencies[statement]
+            latencies.move_to_end(statement)
+        except KeyError:
+            if len(latencies) >= MAX_LATENCY_STATEMENTS:
+                latencies.popitem(last=False)
+            histogram = latencies[statement] = [0] * (len(LATENCY_BUCKETS) + 1)
+        histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def __repr__(self):
+        return (
+            f"Stats(bytes_sent={self.bytes_sent}, "
+            f"bytes_received={self.bytes_received}, round_trips={self.round_trips}, "
+            f"rows={self.rows}, socket_time={self.socket_time}, "
+            f"converter_time={self.converter_time})"
+        )
+
+
+def _count_message(code, handler, stats):
+    def counted_handler(con, data, context):
+        start = perf_counter()
+        handler(con, data, context)
+        stats.message_times[code] += perf_counter() - start
+        stats.messages[code] += 1
+
+    return counted_handler
+
+
+class _StatsSocket:
+    """Wraps the socket file of a connection to count the bytes going through it, and
+    to time how long is spent waiting on it.
+    """
+
+    def __init__(self, sock, stats):
+        self.sock = sock
+        self.stats = stats
+        self._awaiting_reply = False
+
+    def read(self, size):
+        stats = self.stats
+        if self._awaiting_reply:
+            stats.round_trips += 1
+            self._awaiting_reply = False
+        start = perf_counter()
+        block = self.sock.read(size)
+        stats.socket_time += perf_counter() - start
+        stats.bytes_received += len(block)
+        return block
+
+    def write(self, d):
+        self.stats.bytes_sent += len(d)
+        return self.sock.write(d)
+
+    def peek(self, size):
+        start = perf_counter()
+        block = self.sock.peek(size)
+        self.stats.socket_time += perf_counter() - start
+        return block
+
+    def flush(self):
+        start = perf_counter()
+        self.sock.flush()
+        self.stats.socket_time += perf_counter() - start
+        self._awaiting_reply = True
+
+    def __getattr__(self, name):
+        return getattr(self.sock, name)
+
 
 class Context:
-    def __init__(self, statement, stream=None, columns=None, input_funcs=None):
+    def __init__(
+        self,
+        statement,
+        stream=None,
+        columns=None,
+        input_funcs=None,
+        lazy=False,
+        memo=None,
+        spill=None,
+        sinks=None,
+    ):
+        if sinks is not None and (lazy or spill is not None):
+            raise InterfaceError("sinks can't be used with lazy or spill")
+
         self.statement = statement
-        self.rows = None if columns is None else []
+        self.spill = spill
+        # Only timed when there are stats or listeners, see start_timing()
+        self.start = self._phase_start = None
+        self.timings = {}
+        self.first_byte_pending = False
+        self.listener_error = None  # The first exception raised by a listener
+        if columns is None:
+            self.rows = None
+        else:
+            self.rows = [] if spill is None else SpilledRows(spill)
         self.row_count = -1
         self.columns = columns
         self.stream = stream
         self.input_funcs = [] if input_funcs is None else input_funcs
         self.error = None
+        self.lazy = lazy
+        self.memo = memo
+
+        # Whether an Execute with a row limit stopped before the end of the rows
+        self.suspended = False
+
+        # File-like objects keyed by column name, and the index of each of the columns
+        # that has a sink, with the sink and whether the value is hex encoded bytea
+        self.sinks = sinks
+        self._sink_columns = None
+        self._sink_idxs = None
+
+        # For a simple query, which can have more than one statement, the result of
+        # each statement, and the columns and index of the first row of the statement
+        # being read
+        self._results = None
+        self._result_columns = None
+        self._result_start = 0
+
+    @property
+    def results(self):
+        """A list of the results of each statement."""
+        if self._results is None:
+            return [Result(self.columns, self.rows, self.row_count)]
+        return self._results
+
+    def start_timing(self):
+        self.start = self._phase_start = perf_counter()
+
+    def end_phase(self, phase):
+        if self._phase_start is None:
+            return
+        now = perf_counter()
+        self.timings[phase] = now - self._phase_start
+        self._phase_start = now
+
+    @property
+    def input_funcs(self):
+        return self._input_funcs
+
+    @input_funcs.setter
+    def input_funcs(self, input_funcs):
+        self._input_funcs = input_funcs
+
+        # Whether each input function takes the raw bytes of a value
+        self.raw_inputs = [_is_raw_in_func(f) for f in input_funcs]
+
+
+class Result:
+    """The result of one statement. ``columns`` and ``rows`` are ``None`` if the
+    statement doesn't return rows, and ``row_count`` is -1 if it isn't known.
+    """
+
+    def __init__(self, columns, rows, row_count):
+        self.columns = columns
+        self.rows = rows
+        self.row_count = row_count
+
+    def __repr__(self):
+        return f"<Result columns={self.columns} row_count={self.row_count}>"
+
+
+class Pipeline:
+    """Queues statements, and when the ``with`` block ends sends them to the server
+    together and reads all the results. A Sync point ends a group of statements, and
+    an error in a statement means the rest of its group is skipped. With ``isolate``
+    there's a Sync point after every statement.
+    """
+
+    def __init__(self, con, isolate=False):
+        self.con = con
+        self.isolate = isolate
+        self._groups = [[]]
+        self._handles = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+
+    def _queue(self, statement, vals=(), oids=(), lazy=False, memo=None, spill=None):
+        context = Context(statement, lazy=lazy, memo=memo, spill=spill)
+        params = make_params(self.con.py_types, vals)
+        self._groups[-1].append((context, params, oids))
+        handle = PipelineHandle(context)
+        self._handles.append(handle)
+        if self.isolate:
+            self.sync()
+        return handle
+
+    def sync(self):
+        """Adds a Sync point after the statements queued so far."""
+        if len(self._groups[-1]) > 0:
+            self._groups.append([])
+
+    def _begin(self):
+        return False
+
+    def flush(self):
+        """Sends the queued statements and reads the results. The error of the first
+        statement that failed is raised.
+        """
+        groups = [group for group in self._groups if len(group) > 0]
+        handles = self._handles
+        self._groups = [[]]
+        self._handles = []
+        if len(groups) == 0:
+            return
+
+        try:
+            self.con.execute_pipeline(groups, begin=self._begin())
+        finally:
+            for handle in handles:
+                handle.done = True
+
+
+class RowStream:
+    """An iterator over the rows of a result, which reads each row from the socket as
+    it's needed. If it's closed before the end, the rest of the rows are read and
+    discarded, and this also happens if another statement is sent on the connection.
+    The error of a failed statement is raised after the rows that came before it, or
+    by ``close()``, but not by the other statement.
+    """
+
+    def __init__(self, con, context):
+        self._con = con
+        self._context = context
+        self._done = False
+        self._error = None  # An error that's still to be raised
+
+    @property
+    def columns(self):
+        return self._context.columns
+
+    @property
+    def row_count(self):
+        return self._context.row_count
+
+    def __iter__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __next__(self):
+        if self._done:
+            self._raise_error()
+            raise StopIteration
+
+        try:
+            row = self._con._next_row(self._context)
+        except BaseException:
+            self._end()
+            raise
+
+        if row is None:
+            self._end()
+            self._error = self._context.error
+            self._raise_error()
+            raise StopIteration
+        return row
+
+    def _end(self):
+        self._done = True
+        if self._con._stream is self:
+            self._con._stream = None
+
+    def _raise_error(self):
+        error = self._error
+        if error is not None:
+            self._error = None
+            raise error
+
+    def _drain(self):
+        # Reads and discards the rest of the rows, keeping the error to be raised
+        if not self._done:
+            self._end()
+            while self._con._next_row(self._context) is not None:
+                pass
+            self._error = self._context.error
+
+    def close(self):
+        """Reads and discards the rest of the rows."""
+        self._drain()
+        self._raise_error()
+
+
+class Portal:
+    """An iterator over the rows of a statement that's bound to a portal of its own,
+    which fetches the rows from the server ``batch_size`` at a time. Unlike a
+    RowStream, the connection can be used for other statements between fetches,
+    including fetches from other portals, so that the results of several statements
+    of a transaction can be read side by side.
+    """
+
+    def __init__(self, con, name_bin, context, batch_size):
+        self._con = con
+        self._name_bin = name_bin
+        self._context = context
+        self.batch_size = batch_size
+        self._row_iter = None
+        self._row_count = 0
+        self._done = False
+
+    @property
+    def columns(self):
+        return self._context.columns
+
+    @property
+    def row_count(self):
+        """The number of rows fetched from the server so far."""
+        return self._row_count
+
+    def __iter__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __next__(self):
+        if self._row_iter is None:
+            if self._done:
+                raise StopIteration
+            self._start_batch()
+        row = next(self._row_iter, None)
+        if row is None and self._context.suspended:
+            try:
+                self._con._fetch_portal(self._name_bin, self._context, self.batch_size)
+            except BaseException:
+                self._end()
+                raise
+            self._start_batch()
+            row = next(self._row_iter, None)
+        if row is None:
+            self._end()
+            raise StopIteration
+        return row
+
+    def _start_batch(self):
+        rows = self._context.rows
+        self._row_count += 0 if rows is None else len(rows)
+        self._row_iter = iter(() if rows is None else rows)
+
+    def _end(self):
+        # The portal is closed on the server when the next portal is bound, if the
+        # server hasn't already dropped it at the end of the transaction
+        if not self._done:
+            self._done = True
+            self._row_iter = None
+            self._con._closed_portals.append(self._name_bin)
+
+    def close(self):
+        """Closes the portal, discarding any rows that haven't been fetched."""
+        self._end()
+
+
+class PipelineHandle:
+    """The result of a statement in a pipeline, which is available once the pipeline
+    has been sent. Getting ``rows``, ``columns`` or ``row_count`` raises the
+    statement's error if it failed.
+    """
+
+    def __init__(self, context):
+        self._context = context
+        self.done = False
+
+    def _get_context(self):
+        if not self.done:
+            raise InterfaceError("The pipeline hasn't been sent yet")
+        context = self._context
+        if context.error is not None:
+            raise context.error
+        return context
+
+    @property
+    def error(self):
+        return self._context.error
+
+    @property
+    def rows(self):
+        return self._get_context().rows
+
+    @property
+    def columns(self):
+        return self._get_context().columns
+
+    @property
+    def row_count(self):
+        return self._get_context().row_count
+
+
+class ResultRows(Sequence):
+    """The rows of one statement of a multi-statement query, as a view of the rows of
+    the whole query.
+    """
+
+    __slots__ = ("_rows", "_start", "_stop")
+
+    def __init__(self, rows, start, stop):
+        self._rows = rows
+        self._start = start
+        self._stop = stop
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+
+        num_rows = len(self)
+        if idx < 0:
+            idx += num_rows
+        if not 0 <= idx < num_rows:
+            raise IndexError("row index out of range")
+        return self._rows[self._start + idx]
+
+    def __iter__(self):
+        rows = self._rows
+        for i in range(self._start, self._stop):
+            yield rows[i]
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence) and not isinstance(other, (str, bytes)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+_UNCONVERTED = object()
+
+
+class LazyRow(Sequence):
+    """A row that keeps the raw DataRow message, and only converts each value to a
+    Python object the first time it's accessed.
+    """
+
+    __slots__ = ("_data", "_funcs", "_raws", "_encoding", "_offsets", "_values")
+
+    def __init__(self, data, input_funcs, raw_inputs, encoding):
+        self._data = data
+        self._funcs = input_funcs
+        self._raws = raw_inputs
+        self._encoding = encoding
+        self._offsets = None
+        self._values = None
+
+    def _find_offsets(self):
+        data = self._data
+        offsets = []
+        idx = 2
+        for _ in range(len(self._funcs)):
+            vlen = i_unpack(data, idx)[0]
+            idx += 4
+            if vlen == -1:
+                offsets.append(None)
+            else:
+                offsets.append((idx, idx + vlen))
+                idx += vlen
+        self._offsets = offsets
+        self._values = [_UNCONVERTED] * len(offsets)
+
+    def __len__(self):
+        return len(self._funcs)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+
+        if self._values is None:
+            self._find_offsets()
+
+        v = self._values[idx]
+        if v is _UNCONVERTED:
+            offset = self._offsets[idx]
+            if offset is None:
+                v = None
+            else:
+                val = self._data[offset[0] : offset[1]]
+                func = self._funcs[idx]
+                v = func(val) if self._raws[idx] else func(val.decode(self._encoding))
+            self._values[idx] = v
+        return v
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence) and not isinstance(other, (str, bytes)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class SpilledRows(Sequence):
+    """The rows of a result, where once the raw DataRow messages of the rows held in
+    memory add up to more than ``budget`` bytes, the DataRow messages of subsequent rows
+    are written to a temporary file. The file is mapped back into memory, and each of
+    these rows is converted every time it's accessed.
+    """
+
+    def __init__(self, budget):
+        self._budget = budget
+        self._size = 0
+        self._rows = []
+        self._file = None
+        self._map = None
+        self._offsets = array("q", [0])
+
+        # The different ways of converting rows (a multi-statement query can have more
+        # than one), and the index of the one used for each row in the file
+        self._formats = []
+        self._format_idxs = array("I")
+
+    def spill(self, data, context, encoding):
+        """Returns ``True`` if the row has been written to the file, or ``False`` if it
+        should be added in memory.
+        """
+        if self._file is None:
+            self._size += len(data)
+            if self._size <= self._budget:
+                return False
+
+            from tempfile import TemporaryFile
+
+            self._file = TemporaryFile()
+
+        if len(self._formats) == 0 or self._formats[-1][1] is not context.raw_inputs:
+            self._formats.append(
+                (context.input_funcs, context.raw_inputs, context.lazy, encoding)
+            )
+        self._format_idxs.append(len(self._formats) - 1)
+
+        self._file.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+        return True
+
+    def append(self, row):
+        self._rows.append(row)
+
+    def _read_row(self, idx):
+        start, end = self._offsets[idx], self._offsets[idx + 1]
+        if self._map is None or len(self._map) < end:
+            self._file.flush()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        input_funcs, raw_inputs, lazy, encoding = self._formats[self._format_idxs[idx]]
+        row = LazyRow(self._map[start:end], input_funcs, raw_inputs, encoding)
+        return row if lazy else list(row)
+
+    def __len__(self):
+        return len(self._rows) + len(self._format_idxs)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+
+        num_rows = len(self)
+        if idx < 0:
+            idx += num_rows
+        if not 0 <= idx < num_rows:
+            raise IndexError("row index out of range")
+
+        mem_rows = len(self._rows)
+        if idx < mem_rows:
+            return self._rows[idx]
+        return self._read_row(idx - mem_rows)
+
+    def __iter__(self):
+        yield from self._rows
+        for i in range(len(self._format_idxs)):
+            yield self._read_row(i)
+
+    def close(self):
+        """Removes the temporary file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+
+    def __del__(self):
+        self.close()
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence) and not isinstance(other, (str, bytes)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
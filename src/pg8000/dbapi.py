@@ -44,20 +44,23 @@ from pg8000.converters import (
     VARCHAR,
     VARCHAR_ARRAY,
     XID,
+    identifier,
 )
 from pg8000.core import (
     Context,
     CoreConnection,
+    IDLE,
     IN_FAILED_TRANSACTION,
     IN_TRANSACTION,
-    ver,
+    Pipeline as CorePipeline,
+    _version,
+    connect_hosts,
+    disable_scram_cache,
+    enable_scram_cache,
 )
 from pg8000.exceptions import DatabaseError, Error, InterfaceError
 from pg8000.types import Range
 
-
-__version__ = ver
-
 # Copyright (c) 2007-2009, Mathieu Fenniak
 # Copyright (c) The Contributors
 # All rights reserved.
@@ -208,22 +211,31 @@ def connect(
     replication=None,
     startup_params=None,
     sock=None,
+    ssl_negotiation="postgres",
+    target_session_attrs="any",
+    connect_timeout=None,
 ):
-    return Connection(
-        user,
-        host=host,
-        database=database,
-        port=port,
-        password=password,
-        source_address=source_address,
-        unix_sock=unix_sock,
-        ssl_context=ssl_context,
-        timeout=timeout,
-        tcp_keepalive=tcp_keepalive,
-        application_name=application_name,
-        replication=replication,
-        startup_params=startup_params,
-        sock=sock,
+    def make_connection(host, port, timeout):
+        return Connection(
+            user,
+            host=host,
+            database=database,
+            port=port,
+            password=password,
+            source_address=source_address,
+            unix_sock=unix_sock,
+            ssl_context=ssl_context,
+            timeout=timeout,
+            tcp_keepalive=tcp_keepalive,
+            application_name=application_name,
+            replication=replication,
+            startup_params=startup_params,
+            sock=sock,
+            ssl_negotiation=ssl_negotiation,
+        )
+
+    return connect_hosts(
+        make_connection, host, port, timeout, target_session_attrs, connect_timeout
     )
 
 
@@ -399,6 +411,11 @@ class Cursor:
         self._context = None
         self._row_iter = None
 
+        # For a query with more than one statement, the result that's being fetched
+        # and the ones that are still to come
+        self._result = None
+        self._results = None
+
         self._input_oids = ()
 
     @property
@@ -412,6 +429,8 @@ class Cursor:
         if context is None:
             return -1
 
+        if self._result is not None:
+            return self._result.row_count
         return context.row_count
 
     @property
@@ -420,7 +439,7 @@ class Cursor:
         if context is None:
             return None
 
-        row_desc = context.columns
+        row_desc = context.columns if self._result is None else self._result.columns
         if row_desc is None:
             return None
         if len(row_desc) == 0:
@@ -435,7 +454,16 @@ class Cursor:
     # or mapping and will be bound to variables in the operation.
     # <p>
     # Stability: Part of the DBAPI 2.0 specification.
-    def execute(self, operation, args=(), stream=None):
+    def execute(
+        self,
+        operation,
+        args=(),
+        stream=None,
+        lazy=False,
+        memo=None,
+        spill=None,
+        sinks=None,
+    ):
         """Executes a database operation.  Parameters may be provided as a
         sequence, or as a mapping, depending upon the value of
         :data:`pg8000.paramstyle`.
@@ -461,23 +489,52 @@ class Cursor:
             object, and for COPY TO it must be writable.
 
             .. versionadded:: 1.9.11
+
+        :param lazy: This is a pg8000 extension. If ``True`` then each value in a
+            row is only converted to a Python object when it's first accessed.
+
+        :param memo: This is a pg8000 extension. Either ``True``, or a collection of
+            column names. The values of the given columns (or all columns if
+            ``True``) are memoized, so that repeated values are only converted
+            once.
+
+        :param spill: This is a pg8000 extension. The maximum number of bytes of
+            raw row data to hold in memory. Rows beyond this are written to a
+            temporary file, and converted as they're fetched.
+
+        :param sinks: This is a pg8000 extension. A mapping of column names to
+            binary file-like objects. The values of these columns are written to
+            their sinks in chunks rather than being held in memory, and in the row
+            each value is replaced by the number of bytes written.
         """
         try:
-            if not self._c._in_transaction and not self._c.autocommit:
-                self._c.execute_simple("begin transaction")
+            # The BEGIN of an implicit transaction is sent with the statement
+            begin = not self._c._in_transaction and not self._c.autocommit
 
             if len(args) == 0 and stream is None:
-                self._context = self._c.execute_simple(operation)
+                self._context = self._c.execute_simple(
+                    operation,
+                    lazy=lazy,
+                    memo=memo,
+                    spill=spill,
+                    begin=begin,
+                    sinks=sinks,
+                )
             else:
                 statement, vals = convert_paramstyle(paramstyle, operation, args)
                 self._context = self._c.execute_unnamed(
-                    statement, vals=vals, oids=self._input_oids, stream=stream
+                    statement,
+                    vals=vals,
+                    oids=self._input_oids,
+                    stream=stream,
+                    lazy=lazy,
+                    memo=memo,
+                    spill=spill,
+                    begin=begin,
+                    sinks=sinks,
                 )
 
-            if self._context.rows is None:
-                self._row_iter = None
-            else:
-                self._row_iter = iter(self._context.rows)
+            self._start_results()
             self._input_oids = ()
         except AttributeError as e:
             if self._c is None:
@@ -512,11 +569,52 @@ class Cursor:
 
         if len(rowcounts) == 0:
             self._context = Context(None)
+            self._start_results()
         elif -1 in rowcounts:
             self._context.row_count = -1
         else:
             self._context.row_count = sum(rowcounts)
 
+    def _start_results(self):
+        results = self._context._results
+        if results is not None and len(results) > 1:
+            # The cursor starts on the first result that has rows, or the last result
+            # if none of them do, and nextset() moves on from there
+            start = next(
+                (i for i, result in enumerate(results) if result.columns is not None),
+                len(results) - 1,
+            )
+            self._results = iter(results[start:])
+            self.nextset()
+        else:
+            self._result = self._results = None
+            rows = self._context.rows
+            self._row_iter = None if rows is None else iter(rows)
+
+    def nextset(self):
+        """Skips to the result of the next statement of a query that has more than
+        one statement, discarding any rows of the current result that haven't been
+        fetched.
+
+        This method is part of the `DBAPI 2.0 specification
+        <http://www.python.org/dev/peps/pep-0249/>`_.
+
+        :returns:
+
+            ``True`` if there's a next result, and ``None`` if there isn't.
+        """
+        if self._context is None:
+            raise ProgrammingError("A query hasn't been issued.")
+
+        result = None if self._results is None else next(self._results, None)
+        if result is None:
+            self._results = None
+            return None
+
+        self._result = result
+        self._row_iter = None if result.rows is None else iter(result.rows)
+        return True
+
     def callproc(self, procname, parameters=None):
         args = [] if parameters is None else parameters
         operation = f"CALL {procname}(" + ", ".join(["%s" for _ in args]) + ")"
@@ -525,11 +623,7 @@ class Cursor:
             statement, vals = convert_paramstyle("format", operation, args)
 
             self._context = self._c.execute_unnamed(statement, vals=vals)
-
-            if self._context.rows is None:
-                self._row_iter = None
-            else:
-                self._row_iter = iter(self._context.rows)
+            self._start_results()
 
         except AttributeError as e:
             if self._c is None:
@@ -574,7 +668,10 @@ class Cursor:
         except StopIteration as e:
             if self._context is None:
                 raise ProgrammingError("A query hasn't been issued.")
-            elif len(self._context.columns) == 0:
+
+            result = self._result
+            columns = self._context.columns if result is None else result.columns
+            if len(columns) == 0:
                 raise ProgrammingError("no result set")
             else:
                 raise e
@@ -648,6 +745,179 @@ class Cursor:
         pass
 
 
+# The SQLSTATE of an error for a cursor that doesn't exist
+INVALID_CURSOR_NAME = "34000"
+
+# The savepoint that a cursor from an earlier transaction is closed in
+CLOSE_SAVEPOINT = "pg8000_close_cursor"
+
+
+class NamedCursor(Cursor):
+    """A cursor that declares a server-side cursor for the query, so that the rows
+    are fetched from the server in batches of ``itersize`` rows rather than all at
+    once. Returned by ``Connection.cursor()`` when a name is given.
+    """
+
+    def __init__(
+        self, connection, name, withhold=False, scrollable=None, itersize=2000
+    ):
+        super().__init__(connection)
+        self.name = name
+        self.withhold = withhold
+        self.scrollable = scrollable
+        self.itersize = itersize
+
+        self._declared = False
+        self._transaction = None
+        self._done = True
+        self._pos = 0
+        self._row_count = -1
+        self._lazy = False
+        self._memo = None
+
+    @property
+    def rowcount(self):
+        return self._row_count
+
+    @property
+    def _ident(self):
+        return identifier(self.name)
+
+    def execute(self, operation, args=(), lazy=False, memo=None):
+        """Declares the server-side cursor for the query and fetches the first batch
+        of rows. The parameters are as for ``Cursor.execute()``.
+        """
+        if self._declared:
+            self._close_cursor()
+
+        if self.scrollable is None:
+            scroll = ""
+        else:
+            scroll = "SCROLL " if self.scrollable else "NO SCROLL "
+        hold = " WITH HOLD" if self.withhold else ""
+        super().execute(
+            f"DECLARE {self._ident} {scroll}CURSOR{hold} FOR {operation}",
+            args,
+        )
+        self._declared = True
+        self._transaction = self._c._transactions_ended
+        self._lazy = lazy
+        self._memo = memo
+        self._pos = 0
+        self._row_count = 0
+        self._fetch()
+
+    def executemany(self, operation, param_sets):
+        raise ProgrammingError("executemany() can't be called on a named cursor")
+
+    def _fetch(self):
+        context = self._c.execute_simple(
+            f"FETCH FORWARD {int(self.itersize)} FROM {self._ident}",
+            lazy=self._lazy,
+            memo=self._memo,
+        )
+        self._context = context
+        self._row_iter = iter(context.rows)
+        self._row_count += len(context.rows)
+        self._done = len(context.rows) < self.itersize
+
+    def __next__(self):
+        if not self._declared:
+            raise ProgrammingError("A query hasn't been issued.")
+
+        row = next(self._row_iter, None)
+        if row is None and not self._done:
+            self._fetch()
+            row = next(self._row_iter, None)
+        if row is None:
+            raise StopIteration()
+        self._pos += 1
+        return row
+
+    def scroll(self, value, mode="relative"):
+        """Moves the cursor to a new position in the result. In ``relative`` mode the
+        value is added to the current position, and in ``absolute`` mode it's the new
+        position, where the position is the number of rows before the next row to be
+        fetched. Moving backwards needs a cursor that's declared ``scrollable=True``.
+
+        This method is an optional extension of the `DBAPI 2.0 specification
+        <http://www.python.org/dev/peps/pep-0249/>`_.
+        """
+        if mode == "relative":
+            pos = self._pos + value
+        elif mode == "absolute":
+            pos = value
+        else:
+            raise ProgrammingError(f"Invalid scroll mode '{mode}'")
+
+        if not self._declared:
+            raise ProgrammingError("A query hasn't been issued.")
+        if pos < 0:
+            raise IndexError("The scroll position is out of range")
+
+        if pos >= self._pos:
+            self._skip(pos - self._pos)
+        elif self.scrollable:
+            self._c.execute_simple(f"MOVE ABSOLUTE {int(pos)} FROM {self._ident}")
+            self._pos = pos
+            self._row_iter = iter(())
+            self._done = False
+        else:
+            raise ProgrammingError("Scrolling backwards needs a scrollable cursor")
+
+    def _skip(self, num):
+        # The rows that have already been fetched are skipped first, and then the
+        # server-side cursor, which is after those rows, is moved forward
+        skipped = sum(1 for _ in islice(self._row_iter, num))
+        if skipped < num and not self._done:
+            context = self._c.execute_simple(
+                f"MOVE FORWARD {int(num - skipped)} FROM {self._ident}"
+            )
+            self._done = context.row_count < num - skipped
+            skipped += context.row_count
+        self._pos += skipped
+
+    def _close_cursor(self):
+        # The server drops a cursor at the end of the transaction that declared it,
+        # unless it's declared WITH HOLD and the transaction is committed
+        self._declared = False
+        con = self._c
+        status = con._transaction_status
+        if status == IN_FAILED_TRANSACTION:
+            return
+
+        if con._transactions_ended == self._transaction:
+            con.execute_simple(f"CLOSE {self._ident}")
+        elif self.withhold and status == IDLE:
+            try:
+                con.execute_simple(f"CLOSE {self._ident}")
+            except DatabaseError as e:
+                # The transaction that declared the cursor was rolled back
+                if e.args[0].get("C") != INVALID_CURSOR_NAME:
+                    raise
+        elif self.withhold:
+            # In a later transaction the CLOSE is done in a savepoint, so that if the
+            # cursor doesn't exist the error doesn't abort the transaction
+            try:
+                con.execute_simple(
+                    f"SAVEPOINT {CLOSE_SAVEPOINT}; CLOSE {self._ident}; "
+                    f"RELEASE SAVEPOINT {CLOSE_SAVEPOINT}"
+                )
+            except DatabaseError as e:
+                if e.args[0].get("C") != INVALID_CURSOR_NAME:
+                    raise
+                con.execute_simple(
+                    f"ROLLBACK TO SAVEPOINT {CLOSE_SAVEPOINT}; "
+                    f"RELEASE SAVEPOINT {CLOSE_SAVEPOINT}"
+                )
+
+    def close(self):
+        """Closes the server-side cursor, and then the cursor."""
+        if self._c is not None and self._declared and self._c._sock is not None:
+            self._close_cursor()
+        super().close()
+
+
 class Connection(CoreConnection):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -672,14 +942,36 @@ class Connection(CoreConnection):
     def _in_transaction(self):
         return self._transaction_status in (IN_TRANSACTION, IN_FAILED_TRANSACTION)
 
-    def cursor(self):
+    def cursor(self, name=None, withhold=False, scrollable=None, itersize=2000):
         """Creates a :class:`Cursor` object bound to this
         connection.
 
         This function is part of the `DBAPI 2.0 specification
         <http://www.python.org/dev/peps/pep-0249/>`_.
+
+        :param name: This is a pg8000 extension. If given, a :class:`NamedCursor` is
+            returned, which declares a server-side cursor with this name.
+
+        :param withhold: For a named cursor, if ``True`` the server-side cursor is
+            declared ``WITH HOLD`` so that it can be used after the transaction has
+            been committed.
+
+        :param scrollable: For a named cursor, if ``True`` the server-side cursor is
+            declared ``SCROLL``, and if ``False`` it's declared ``NO SCROLL``. The
+            default of ``None`` leaves it to the server.
+
+        :param itersize: For a named cursor, the number of rows fetched from the
+            server at a time.
+        """
+        if name is None:
+            return Cursor(self)
+        return NamedCursor(self, name, withhold, scrollable, itersize)
+
+    def pipeline(self, isolate=False):
+        """Returns a :class:`Pipeline` that sends the statements that are queued on
+        it to the server together. This is a pg8000 extension.
         """
-        return Cursor(self)
+        return Pipeline(self, isolate=isolate)
 
     def commit(self):
         """Commits the current database transaction.
@@ -825,6 +1117,26 @@ class Connection(CoreConnection):
             self.autocommit = previous_autocommit_mode
 
 
+class Pipeline(CorePipeline):
+    """Queues statements, and when the ``with`` block ends sends them to the server
+    together. Unless autocommit is on, a transaction is begun if one isn't already
+    open. This is a pg8000 extension.
+    """
+
+    def execute(self, operation, args=(), lazy=False, memo=None, spill=None):
+        """Queues a statement, with parameters as for :meth:`Cursor.execute`, and
+        returns a handle for its result.
+        """
+        if len(args) == 0:
+            statement, vals = operation, ()
+        else:
+            statement, vals = convert_paramstyle(paramstyle, operation, args)
+        return self._queue(statement, vals, lazy=lazy, memo=memo, spill=spill)
+
+    def _begin(self):
+        return not self.con._in_transaction and not self.con.autocommit
+
+
 class Warning(Exception):
     """Generic exception raised for important database warnings like data
     truncations.  This exception is not currently used by pg8000.
@@ -916,6 +1228,12 @@ class ArrayContentNotSupportedError(NotSupportedError):
     pass
 
 
+def __getattr__(name):
+    if name == "__version__":
+        return _version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "BIGINT",
     "BINARY",
@@ -951,6 +1269,7 @@ __all__ = [
     "NULLTYPE",
     "NUMERIC",
     "NUMERIC_ARRAY",
+    "NamedCursor",
     "NotSupportedError",
     "OID",
     "OperationalError",
@@ -975,4 +1294,6 @@ __all__ = [
     "Warning",
     "XID",
     "connect",
+    "disable_scram_cache",
+    "enable_scram_cache",
 ]
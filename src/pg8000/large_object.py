@@ -0,0 +1,161 @@
+from io import RawIOBase, SEEK_CUR, SEEK_END, SEEK_SET
+
+from pg8000.core import IN_FAILED_TRANSACTION, IN_TRANSACTION
+from pg8000.exceptions import InterfaceError
+
+# The modes of lo_open()
+INV_WRITE = 0x20000
+INV_READ = 0x40000
+
+# The number of bytes sent or received by each call of loread() or lowrite()
+DEFAULT_CHUNK_SIZE = 256 * 1024
+
+
+def _in_transaction(con):
+    return con._transaction_status in (IN_TRANSACTION, IN_FAILED_TRANSACTION)
+
+
+def _run(con, sql, begin=False):
+    # The parameters of the lo_* functions are all integers or bytes, and so they're
+    # put in the SQL as literals, and each call is a single round trip
+    return con.execute_simple(sql, begin=begin).rows[0][0]
+
+
+class LargeObject(RawIOBase):
+    """A file-like object for reading and writing a PostgreSQL large object, which
+    can only be used within a transaction.
+
+    - *con* - A ``pg8000.native.Connection`` or ``pg8000.dbapi.Connection``.
+    - *oid* - The OID of the large object, or ``None`` to create a new one.
+    - *mode* - As for the built-in ``open()``, but always binary, so one of ``r``,
+      ``w``, ``a``, ``r+``, ``w+`` or ``a+``, with an optional ``b``.
+    - *chunk_size* - The maximum number of bytes sent or received in one round trip.
+    """
+
+    def __init__(self, con, oid=None, mode="rb", chunk_size=DEFAULT_CHUNK_SIZE):
+        kind = mode.replace("b", "")
+        if kind not in ("r", "w", "a", "r+", "w+", "a+"):
+            raise InterfaceError(f"Invalid mode '{mode}'")
+
+        self.con = con
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self._fd = None
+        self._readable = kind[0] == "r" or "+" in kind
+        self._writable = kind[0] != "r" or "+" in kind
+
+        # A DB-API connection that isn't in autocommit mode begins a transaction
+        begin = not _in_transaction(con) and not getattr(con, "autocommit", True)
+        if not begin and not _in_transaction(con):
+            raise InterfaceError("A large object can only be used in a transaction")
+
+        flags = (INV_READ if self._readable else 0) | (
+            INV_WRITE if self._writable else 0
+        )
+        if oid is None:
+            self.oid = _run(con, "SELECT lo_create(0)", begin)
+            begin = False
+        else:
+            self.oid = oid
+        self._fd = _run(con, f"SELECT lo_open({int(self.oid)}, {flags})", begin)
+
+        # Descriptors belong to the transaction that opened them, and are reused by
+        # later transactions, so the descriptor mustn't be used after it has ended
+        self._transaction = con._transactions_ended
+
+        if kind[0] == "w" and oid is not None:
+            self.truncate(0)
+        elif kind[0] == "a":
+            self.seek(0, SEEK_END)
+
+    def readable(self):
+        return self._readable
+
+    def writable(self):
+        return self._writable
+
+    def seekable(self):
+        return True
+
+    def _in_own_transaction(self):
+        return self.con._transactions_ended == self._transaction
+
+    def _check_open(self):
+        if self.closed:
+            raise ValueError("I/O operation on closed large object")
+        if not self._in_own_transaction():
+            raise InterfaceError("The transaction of the large object has ended")
+
+    def read(self, size=-1):
+        self._check_open()
+        if not self._readable:
+            raise InterfaceError("The large object isn't open for reading")
+
+        chunks = []
+        while size != 0:
+            n = self.chunk_size if size < 0 else min(size, self.chunk_size)
+            chunk = _run(self.con, f"SELECT loread({self._fd}, {n})")
+            chunks.append(chunk)
+            if len(chunk) < n:
+                break
+            if size > 0:
+                size -= len(chunk)
+        return b"".join(chunks)
+
+    def readall(self):
+        return self.read()
+
+    def readinto(self, b):
+        view = memoryview(b).cast("B")
+        data = self.read(len(view))
+        view[: len(data)] = data
+        return len(data)
+
+    def write(self, b):
+        self._check_open()
+        if not self._writable:
+            raise InterfaceError("The large object isn't open for writing")
+
+        data = memoryview(b).cast("B")
+        for i in range(0, len(data), self.chunk_size):
+            chunk = data[i : i + self.chunk_size].hex()
+            _run(self.con, f"SELECT lowrite({self._fd}, decode('{chunk}', 'hex'))")
+        return len(data)
+
+    def seek(self, offset, whence=SEEK_SET):
+        self._check_open()
+        if whence not in (SEEK_SET, SEEK_CUR, SEEK_END):
+            raise InterfaceError(f"Invalid whence {whence}")
+        return _run(self.con, f"SELECT lo_lseek64({self._fd}, {int(offset)}, {whence})")
+
+    def tell(self):
+        self._check_open()
+        return _run(self.con, f"SELECT lo_tell64({self._fd})")
+
+    def truncate(self, size=None):
+        self._check_open()
+        if size is None:
+            size = self.tell()
+        _run(self.con, f"SELECT lo_truncate64({self._fd}, {int(size)})")
+        return size
+
+    def close(self):
+        # The descriptor is closed by the server at the end of the transaction
+        con = self.con
+        if (
+            not self.closed
+            and self._fd is not None
+            and con._sock is not None
+            and con._transaction_status == IN_TRANSACTION
+            and self._in_own_transaction()
+        ):
+            _run(con, f"SELECT lo_close({self._fd})")
+        super().close()
+
+    def unlink(self):
+        """Closes and deletes the large object."""
+        self.close()
+        _run(self.con, f"SELECT lo_unlink({int(self.oid)})")
+
+    def __repr__(self):
+        return f"<LargeObject oid={self.oid} mode='{self.mode}'>"
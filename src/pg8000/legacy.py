@@ -51,7 +51,10 @@ from pg8000.core import (
     CoreConnection,
     IN_FAILED_TRANSACTION,
     IN_TRANSACTION,
-    ver,
+    _version,
+    connect_hosts,
+    disable_scram_cache,
+    enable_scram_cache,
 )
 from pg8000.dbapi import (
     BINARY,
@@ -71,8 +74,6 @@ from pg8000.dbapi import (
 )
 from pg8000.exceptions import DatabaseError, Error, InterfaceError
 
-__version__ = ver
-
 # Copyright (c) 2007-2009, Mathieu Fenniak
 # Copyright (c) The Contributors
 # All rights reserved.
@@ -126,21 +127,30 @@ def connect(
     application_name=None,
     replication=None,
     startup_params=None,
+    ssl_negotiation="postgres",
+    target_session_attrs="any",
+    connect_timeout=None,
 ):
-    return Connection(
-        user,
-        host=host,
-        database=database,
-        port=port,
-        password=password,
-        source_address=source_address,
-        unix_sock=unix_sock,
-        ssl_context=ssl_context,
-        timeout=timeout,
-        tcp_keepalive=tcp_keepalive,
-        application_name=application_name,
-        replication=replication,
-        startup_params=startup_params,
+    def make_connection(host, port, timeout):
+        return Connection(
+            user,
+            host=host,
+            database=database,
+            port=port,
+            password=password,
+            source_address=source_address,
+            unix_sock=unix_sock,
+            ssl_context=ssl_context,
+            timeout=timeout,
+            tcp_keepalive=tcp_keepalive,
+            application_name=application_name,
+            replication=replication,
+            startup_params=startup_params,
+            ssl_negotiation=ssl_negotiation,
+        )
+
+    return connect_hosts(
+        make_connection, host, port, timeout, target_session_attrs, connect_timeout
     )
 
 
@@ -246,15 +256,19 @@ class Cursor:
             .. versionadded:: 1.9.11
         """
         try:
-            if not self._c._in_transaction and not self._c.autocommit:
-                self._c.execute_simple("begin transaction")
+            # The BEGIN of an implicit transaction is sent with the statement
+            begin = not self._c._in_transaction and not self._c.autocommit
 
             if len(args) == 0 and stream is None:
-                self._context = self._c.execute_simple(operation)
+                self._context = self._c.execute_simple(operation, begin=begin)
             else:
                 statement, vals = convert_paramstyle(self.paramstyle, operation, args)
                 self._context = self._c.execute_unnamed(
-                    statement, vals=vals, oids=self._input_oids, stream=stream
+                    statement,
+                    vals=vals,
+                    oids=self._input_oids,
+                    stream=stream,
+                    begin=begin,
                 )
 
             rows = [] if self._context.rows is None else self._context.rows
@@ -736,10 +750,13 @@ class PreparedStatement:
         params = make_params(self.con.py_types, self.make_args(vals))
 
         try:
-            if not self.con._in_transaction and not self.con.autocommit:
-                self.con.execute_unnamed("begin transaction")
             self._context = self.con.execute_named(
-                self.name_bin, params, self.row_desc, self.input_funcs, self.operation
+                self.name_bin,
+                params,
+                self.row_desc,
+                self.input_funcs,
+                self.operation,
+                begin=not self.con._in_transaction and not self.con.autocommit,
             )
         except AttributeError as e:
             if self.con is None:
@@ -756,6 +773,12 @@ class PreparedStatement:
         self.con = None
 
 
+def __getattr__(name):
+    if name == "__version__":
+        return _version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "BIGINTEGER",
     "BINARY",
@@ -818,6 +841,8 @@ __all__ = [
     "Warning",
     "XID",
     "connect",
+    "disable_scram_cache",
+    "enable_scram_cache",
     "pginterval_in",
     "pginterval_out",
     "timedelta_in",
@@ -43,12 +43,16 @@ from pg8000.converters import (
     literal,
     make_params,
 )
-from pg8000.core import CoreConnection, ver
+from pg8000.core import (
+    CoreConnection,
+    Pipeline as CorePipeline,
+    _version,
+    disable_scram_cache,
+    enable_scram_cache,
+)
 from pg8000.exceptions import DatabaseError, Error, InterfaceError
 from pg8000.types import Range
 
-__version__ = ver
-
 # Copyright (c) 2007-2009, Mathieu Fenniak
 # Copyright (c) The Contributors
 # All rights reserved.
@@ -89,7 +93,7 @@ class State(Enum):
     IN_DP = auto()  # inside dollar parameter eg. $1
 
 
-def to_statement(query):
+def to_statement(query, reserved=()):
     in_quote_escape = False
     placeholders = []
     output_query = []
@@ -185,10 +189,10 @@ def to_statement(query):
 
         prev_c = c
 
-    for reserved in ("types", "stream"):
-        if reserved in placeholders:
+    for name in ("types", "stream", "lazy", "memo", "spill", "sinks") + reserved:
+        if name in placeholders:
             raise InterfaceError(
-                f"The name '{reserved}' can't be used as a placeholder because it's "
+                f"The name '{name}' can't be used as a placeholder because it's "
                 f"used for another purpose."
             )
 
@@ -230,20 +234,84 @@ class Connection(CoreConnection):
             return None
         return context.row_count
 
-    def run(self, sql, stream=None, types=None, **params):
+    @property
+    def results(self):
+        context = self._context
+        if context is None:
+            return None
+        return context.results
+
+    def run(
+        self,
+        sql,
+        stream=None,
+        types=None,
+        lazy=False,
+        memo=None,
+        spill=None,
+        sinks=None,
+        **params,
+    ):
         if len(params) == 0 and stream is None:
-            self._context = self.execute_simple(sql)
+            self._context = self.execute_simple(
+                sql, lazy=lazy, memo=memo, spill=spill, sinks=sinks
+            )
         else:
             statement, make_vals = to_statement(sql)
             oids = () if types is None else make_vals(defaultdict(lambda: None, types))
             self._context = self.execute_unnamed(
-                statement, make_vals(params), oids=oids, stream=stream
+                statement,
+                make_vals(params),
+                oids=oids,
+                stream=stream,
+                lazy=lazy,
+                memo=memo,
+                spill=spill,
+                sinks=sinks,
             )
         return self._context.rows
 
+    def stream(self, sql, types=None, lazy=False, memo=None, **params):
+        if len(params) == 0:
+            stream = self.execute_stream(sql, lazy=lazy, memo=memo)
+        else:
+            statement, make_vals = to_statement(sql)
+            oids = () if types is None else make_vals(defaultdict(lambda: None, types))
+            stream = self.execute_stream(
+                statement, make_vals(params), oids=oids, lazy=lazy, memo=memo
+            )
+        self._context = stream._context
+        return stream
+
+    def portal(self, sql, types=None, lazy=False, memo=None, batch_size=1000, **params):
+        statement, make_vals = to_statement(sql, reserved=("batch_size",))
+        oids = () if types is None else make_vals(defaultdict(lambda: None, types))
+        portal = self.execute_portal(
+            statement,
+            make_vals(params),
+            oids=oids,
+            batch_size=batch_size,
+            lazy=lazy,
+            memo=memo,
+        )
+        self._context = portal._context
+        return portal
+
     def prepare(self, sql):
         return PreparedStatement(self, sql)
 
+    def pipeline(self, isolate=False):
+        return Pipeline(self, isolate=isolate)
+
+
+class Pipeline(CorePipeline):
+    def run(self, sql, types=None, lazy=False, memo=None, spill=None, **params):
+        statement, make_vals = to_statement(sql)
+        oids = () if types is None else make_vals(defaultdict(lambda: None, types))
+        return self._queue(
+            statement, make_vals(params), oids=oids, lazy=lazy, memo=memo, spill=spill
+        )
+
 
 class PreparedStatement:
     def __init__(self, con, sql, types=None):
@@ -258,11 +326,19 @@ class PreparedStatement:
     def columns(self):
         return self._context.columns
 
-    def run(self, stream=None, **params):
+    def run(self, stream=None, lazy=False, memo=None, spill=None, sinks=None, **params):
         params = make_params(self.con.py_types, self.make_vals(params))
 
         self._context = self.con.execute_named(
-            self.name_bin, params, self.cols, self.input_funcs, self.statement
+            self.name_bin,
+            params,
+            self.cols,
+            self.input_funcs,
+            self.statement,
+            lazy=lazy,
+            memo=memo,
+            spill=spill,
+            sinks=sinks,
         )
 
         return self._context.rows
@@ -271,6 +347,12 @@ class PreparedStatement:
         self.con.close_prepared_statement(self.name_bin)
 
 
+def __getattr__(name):
+    if name == "__version__":
+        return _version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "BIGINT",
     "BOOLEAN",
@@ -314,6 +396,8 @@ __all__ = [
     "VARCHAR",
     "VARCHAR_ARRAY",
     "XID",
+    "disable_scram_cache",
+    "enable_scram_cache",
     "identifier",
     "literal",
 ]
@@ -0,0 +1,199 @@
+from collections import deque
+from itertools import islice
+from queue import Queue
+from threading import Event, Thread
+
+from pg8000.exceptions import DatabaseError, InterfaceError
+from pg8000.native import Connection, literal
+
+# The number of batches of rows that each connection can read ahead of the iterator
+READ_AHEAD = 2
+
+_DONE = object()  # Put on the queue by a worker when it's finished
+
+# Each query is run in this savepoint, so that if it fails the snapshot transaction can
+# still be used by later queries
+SAVEPOINT = "pg8000_parallel"
+
+
+def _query(query):
+    if isinstance(query, str):
+        return query, {}
+    sql, params = query
+    return sql, params
+
+
+def _work(con, tasks, out, stop, batch_size):
+    # Reads the results of the tasks through portals, so that if the reader is
+    # stopped the connection can be used again without reading the rest of the rows
+    try:
+        while not stop.is_set():
+            try:
+                sql, params = tasks.popleft()
+            except IndexError:
+                break
+
+            con.run(f"SAVEPOINT {SAVEPOINT}")
+            try:
+                with con.portal(sql, batch_size=batch_size, **params) as portal:
+                    while not stop.is_set():
+                        batch = list(islice(portal, batch_size))
+                        if len(batch) == 0:
+                            break
+                        out.put(batch)
+            except DatabaseError:
+                con.run(f"ROLLBACK TO SAVEPOINT {SAVEPOINT}")
+                raise
+            con.run(f"RELEASE SAVEPOINT {SAVEPOINT}")
+    except BaseException as e:
+        out.put(e)
+    finally:
+        out.put(_DONE)
+
+
+class Rows:
+    """An iterator over rows that are read by worker threads. Closing it stops the
+    workers, discarding the rest of the rows.
+    """
+
+    def __init__(self, out, stop, workers):
+        self._out = out
+        self._stop = stop
+        self._workers = workers
+        self._remaining = len(workers)
+        self._batch = iter(())
+
+    def __iter__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __next__(self):
+        row = next(self._batch, None)
+        while row is None:
+            if self._remaining == 0:
+                raise StopIteration
+
+            item = self._out.get()
+            if item is _DONE:
+                self._remaining -= 1
+            elif isinstance(item, BaseException):
+                self.close()
+                raise item
+            else:
+                self._batch = iter(item)
+                row = next(self._batch, None)
+        return row
+
+    def close(self):
+        # Stops the workers, and lets any that are waiting to put a batch finish
+        self._stop.set()
+        self._batch = iter(())
+        while self._remaining > 0:
+            if self._out.get() is _DONE:
+                self._remaining -= 1
+        for worker in self._workers:
+            worker.join()
+
+
+class ParallelReader:
+    """Runs read queries in parallel, each on one of several connections, with all
+    the connections seeing the same snapshot of the database. The first connection
+    exports its snapshot, and the others import it, all in read-only ``REPEATABLE
+    READ`` transactions that last until the reader is closed.
+
+    - *workers* - The number of connections to open, which must be at least 1.
+    - *kwargs* - The parameters of ``pg8000.native.Connection``.
+
+    Each query is either an SQL string, or a tuple of an SQL string and a mapping of
+    its parameters. Typically the queries are of partitions of a table, such as ranges
+    of keys or of ``ctid``.
+    """
+
+    def __init__(self, workers, **kwargs):
+        if workers < 1:
+            raise InterfaceError("There must be at least one worker")
+
+        self.connections = []
+        self._iterators = []
+        try:
+            for _ in range(workers):
+                self.connections.append(Connection(**kwargs))
+
+            first = self.connections[0]
+            first.run("START TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+            self.snapshot = first.run("SELECT pg_export_snapshot()")[0][0]
+            for con in self.connections[1:]:
+                con.run(
+                    "START TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY; "
+                    f"SET TRANSACTION SNAPSHOT {literal(self.snapshot)}"
+                )
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _start(self, connections, task_lists, batch_size):
+        out = Queue(READ_AHEAD * len(connections))
+        stop = Event()
+        workers = []
+        for con, tasks in zip(connections, task_lists):
+            worker = Thread(
+                target=_work, args=(con, tasks, out, stop, batch_size), daemon=True
+            )
+            worker.start()
+            workers.append(worker)
+        rows = Rows(out, stop, workers)
+        self._iterators.append(rows)
+        return rows
+
+    def run(self, queries, batch_size=1000):
+        """Returns an iterator over the rows of all the queries, in the order that
+        they arrive. Each connection runs queries until there are none left, reading
+        ``batch_size`` rows at a time. If a query fails, the error is raised by the
+        iterator and the rest of the queries are abandoned.
+        """
+        self._stop_iterators()
+        tasks = deque(_query(q) for q in queries)
+        connections = self.connections[: len(tasks)]
+        return self._start(connections, [tasks] * len(connections), batch_size)
+
+    def partitions(self, queries, batch_size=1000):
+        """Returns a list of iterators, one for the rows of each query, which are run
+        in parallel. There can't be more queries than connections.
+        """
+        queries = [_query(q) for q in queries]
+        if len(queries) > len(self.connections):
+            raise InterfaceError(
+                f"There are {len(queries)} queries but only {len(self.connections)} "
+                f"connections"
+            )
+
+        self._stop_iterators()
+        return [
+            self._start([con], [deque([query])], batch_size)
+            for con, query in zip(self.connections, queries)
+        ]
+
+    def _stop_iterators(self):
+        # Iterators that haven't finished are stopped, as their connections are needed
+        for iterator in self._iterators:
+            iterator.close()
+        self._iterators.clear()
+
+    def close(self):
+        self._stop_iterators()
+        for con in self.connections:
+            try:
+                con.close()
+            except InterfaceError:
+                pass
@@ -0,0 +1,247 @@
+import re
+from time import monotonic, perf_counter
+
+from pg8000.core import IN_FAILED_TRANSACTION, IN_TRANSACTION
+from pg8000.exceptions import DatabaseError, InterfaceError
+
+# The replication lag in seconds of a standby, which is 0 if it has replayed all the
+# WAL that it has received, or if it isn't a standby
+LAG_SQL = (
+    "SELECT COALESCE(CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "THEN 0 ELSE EXTRACT("
+    "EPOCH FROM clock_timestamp() - pg_last_xact_replay_timestamp()) END, 0)"
+)
+
+# Statements that start with one of these words are reads, unless they lock rows, create
+# a table with SELECT INTO or have more than one statement
+READ_COMMANDS = ("SELECT", "SHOW", "TABLE", "VALUES")
+_FIRST_WORD = re.compile(r"(?:\s|\(|--[^\n]*\n|/\*.*?\*/)*(\w+)", re.DOTALL)
+_NOT_READ = re.compile(
+    r"\bFOR\s+(?:NO\s+KEY\s+)?UPDATE\b|\bFOR\s+(?:KEY\s+)?SHARE\b|\bINTO\b|;\s*\S",
+    re.IGNORECASE,
+)
+
+
+def is_read(sql):
+    """Returns True if the SQL is a read that can be sent to a replica. It errs on the
+    side of returning False.
+    """
+    match = _FIRST_WORD.match(sql)
+    return (
+        match is not None
+        and match.group(1).upper() in READ_COMMANDS
+        and _NOT_READ.search(sql) is None
+    )
+
+
+def _in_transaction(con):
+    return con._transaction_status in (IN_TRANSACTION, IN_FAILED_TRANSACTION)
+
+
+class Replica:
+    """A replica connection, with its last measured round trip time and replication
+    lag in seconds. ``available`` is False if the last check failed, or the last query
+    failed with a network error.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rtt = None
+        self.lag = None
+        self.available = True
+
+    def check(self):
+        try:
+            start = perf_counter()
+            context = self.connection.execute_simple(LAG_SQL)
+            self.rtt = perf_counter() - start
+            self.lag = float(context.rows[0][0])
+            self.available = True
+        except (DatabaseError, InterfaceError):
+            self.available = False
+
+    def __repr__(self):
+        return f"<Replica rtt={self.rtt} lag={self.lag} available={self.available}>"
+
+
+class Router:
+    """Sends reads to replicas and everything else to the primary.
+
+    - *primary* - A ``pg8000.native.Connection`` or ``pg8000.dbapi.Connection`` to the
+      primary server.
+    - *replicas* - A sequence of connections of the same kind to replica servers.
+    - *pin_seconds* - After a write, reads go to the primary for this many seconds, so
+      that they see the write.
+    - *check_interval* - How often, in seconds, the round trip time and replication lag
+      of each replica are measured.
+    - *max_lag* - Replicas that lag by more than this many seconds aren't used. The
+      default is ``None``, meaning there's no limit.
+
+    Reads go to the available replica with the lowest round trip time, or to the
+    primary if there isn't one, or if the primary is in a transaction.
+
+    Autocommit is turned on for ``pg8000.dbapi`` replicas, so that a routed read
+    doesn't leave a transaction open on the replica, holding back its vacuum and
+    seeing an old snapshot in later reads.
+    """
+
+    def __init__(
+        self, primary, replicas=(), pin_seconds=1, check_interval=10, max_lag=None
+    ):
+        self.primary = primary
+        for con in replicas:
+            if hasattr(con, "autocommit"):
+                con.autocommit = True
+        self.replicas = [Replica(con) for con in replicas]
+        self.pin_seconds = pin_seconds
+        self.check_interval = check_interval
+        self.max_lag = max_lag
+        self._pinned_until = None
+        self._next_check = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def check_replicas(self):
+        """Measures the round trip time and replication lag of each replica now."""
+        for replica in self.replicas:
+            replica.check()
+        self._next_check = monotonic() + self.check_interval
+
+    def replica(self):
+        """Returns the replica that reads go to, or None if no replica can be used."""
+        if self._next_check is None or monotonic() >= self._next_check:
+            self.check_replicas()
+
+        replicas = [
+            r
+            for r in self.replicas
+            if r.available and (self.max_lag is None or r.lag <= self.max_lag)
+        ]
+        return min(replicas, key=lambda r: r.rtt, default=None)
+
+    def route(self, sql):
+        """Returns the replica for a read, or None if the SQL must go to the primary.
+        Routing a write to the primary pins reads to the primary for ``pin_seconds``.
+        """
+        if is_read(sql) and not _in_transaction(self.primary):
+            if self._pinned_until is None or monotonic() >= self._pinned_until:
+                return self.replica()
+        else:
+            self._pin()
+        return None
+
+    def _pin(self):
+        self._pinned_until = monotonic() + self.pin_seconds
+
+    def _execute(self, sql, func):
+        # A read that fails on a replica with a network error is run on the primary
+        replica = self.route(sql)
+        if replica is not None:
+            try:
+                return func(replica.connection)
+            except InterfaceError:
+                replica.available = False
+        return func(self.primary)
+
+    def run(self, sql, **kwargs):
+        """Runs the SQL, with the same parameters as
+        ``pg8000.native.Connection.run()``.
+        """
+        return self._execute(sql, lambda con: con.run(sql, **kwargs))
+
+    def cursor(self):
+        """Returns a cursor that routes each statement that it executes, for routers of
+        ``pg8000.dbapi`` connections.
+        """
+        return Cursor(self)
+
+    def _connections(self):
+        return [self.primary] + [r.connection for r in self.replicas]
+
+    def commit(self):
+        """Commits the transactions of the primary and the replicas."""
+        for con in self._connections():
+            if _in_transaction(con):
+                con.commit()
+
+    def rollback(self):
+        """Rolls back the transactions of the primary and the replicas."""
+        for con in self._connections():
+            if _in_transaction(con):
+                con.rollback()
+
+    def close(self):
+        for con in self._connections():
+            try:
+                con.close()
+            except InterfaceError:
+                pass
+
+
+class Cursor:
+    """A DB-API cursor that executes each statement on the connection chosen by the
+    router. The results are those of the last statement executed.
+    """
+
+    def __init__(self, router):
+        self.router = router
+        self.arraysize = 1
+        self._cursors = {}
+        self._cursor = None
+
+    def _get_cursor(self, con):
+        try:
+            cursor = self._cursors[id(con)]
+        except KeyError:
+            cursor = self._cursors[id(con)] = con.cursor()
+        cursor.arraysize = self.arraysize
+        self._cursor = cursor
+        return cursor
+
+    def execute(self, operation, args=(), **kwargs):
+        self.router._execute(
+            operation,
+            lambda con: self._get_cursor(con).execute(operation, args, **kwargs),
+        )
+        return self
+
+    def executemany(self, operation, param_sets):
+        self.router._pin()
+        self._get_cursor(self.router.primary).executemany(operation, param_sets)
+        return self
+
+    @property
+    def _last(self):
+        if self._cursor is None:
+            raise InterfaceError("No statement has been executed")
+        return self._cursor
+
+    @property
+    def rowcount(self):
+        return -1 if self._cursor is None else self._cursor.rowcount
+
+    @property
+    def description(self):
+        return None if self._cursor is None else self._cursor.description
+
+    def fetchone(self):
+        return self._last.fetchone()
+
+    def fetchmany(self, num=None):
+        return self._last.fetchmany(num)
+
+    def fetchall(self):
+        return self._last.fetchall()
+
+    def __iter__(self):
+        return iter(self._last)
+
+    def close(self):
+        for cursor in self._cursors.values():
+            cursor.close()
+        self._cursors.clear()
+        self._cursor = None
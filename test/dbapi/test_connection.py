@@ -4,8 +4,15 @@ import warnings
 
 import pytest
 
+from test.fake_server import FakeServer, Result
+
+from pg8000.converters import BOOLEAN, TEXT
 from pg8000.dbapi import DatabaseError, InterfaceError, __version__, connect
 
+PRIMARY = {"in_hot_standby": "off", "default_transaction_read_only": "off"}
+READ_ONLY_PRIMARY = {"in_hot_standby": "off", "default_transaction_read_only": "on"}
+STANDBY = {"in_hot_standby": "on", "default_transaction_read_only": "off"}
+
 
 def test_unix_socket_missing():
     conn_params = {"unix_sock": "/file-does-not-exist", "user": "doesn't-matter"}
@@ -27,6 +34,100 @@ def test_internet_socket_connection_refused():
             pass
 
 
+def connected_port(con):
+    return con._usock.getpeername()[1]
+
+
+@pytest.mark.parametrize(
+    "target_session_attrs,expected",
+    [
+        ("any", 0),
+        ("read-write", 2),
+        ("read-only", 0),
+        ("primary", 1),
+        ("standby", 0),
+        ("prefer-standby", 0),
+    ],
+)
+def test_connect_hosts(target_session_attrs, expected):
+    with (
+        FakeServer(parameter_statuses=STANDBY) as standby,
+        FakeServer(parameter_statuses=READ_ONLY_PRIMARY) as read_only_primary,
+        FakeServer(parameter_statuses=PRIMARY) as primary,
+    ):
+        servers = [standby, read_only_primary, primary]
+        with connect(
+            "postgres",
+            host=["localhost"] * len(servers),
+            port=[s.port for s in servers],
+            target_session_attrs=target_session_attrs,
+        ) as con:
+            assert connected_port(con) == servers[expected].port
+
+
+def test_connect_hosts_failover():
+    with FakeServer(parameter_statuses=PRIMARY) as server:
+        with connect(
+            "postgres",
+            host=["localhost", "localhost"],
+            port=[0, server.port],
+            target_session_attrs="read-write",
+            connect_timeout=1,
+        ) as con:
+            assert connected_port(con) == server.port
+            assert con._usock.gettimeout() is None
+
+
+def test_connect_hosts_prefer_standby():
+    with FakeServer(parameter_statuses=PRIMARY) as server:
+        with connect(
+            "postgres",
+            host=["localhost"],
+            port=server.port,
+            target_session_attrs="prefer-standby",
+        ) as con:
+            assert connected_port(con) == server.port
+
+
+def test_connect_hosts_no_match():
+    with FakeServer(parameter_statuses=STANDBY) as server:
+        with pytest.raises(
+            InterfaceError, match="doesn't match target_session_attrs 'primary'"
+        ):
+            connect(
+                "postgres",
+                host=["localhost", "localhost"],
+                port=[0, server.port],
+                target_session_attrs="primary",
+            )
+
+
+def test_connect_hosts_query():
+    """Servers before PostgreSQL 14 don't report in_hot_standby and
+    default_transaction_read_only, so they're queried"""
+    results = {
+        "SELECT pg_is_in_recovery()": Result(
+            [("pg_is_in_recovery", BOOLEAN)], [[True]]
+        ),
+        "SHOW transaction_read_only": Result(
+            [("transaction_read_only", TEXT)], [["on"]]
+        ),
+    }
+    with FakeServer(results) as server:
+        with connect(
+            "postgres", port=server.port, target_session_attrs="standby"
+        ) as con:
+            assert connected_port(con) == server.port
+
+
+def test_connect_hosts_invalid():
+    with pytest.raises(InterfaceError, match="target_session_attrs must be one of"):
+        connect("postgres", target_session_attrs="read-mostly")
+
+    with pytest.raises(InterfaceError, match="a port for each host"):
+        connect("postgres", host=["localhost", "localhost"], port=[5432])
+
+
 def test_Connection_plain_socket(db_kwargs):
     host = db_kwargs.get("host", "localhost")
     port = db_kwargs.get("port", 5432)
@@ -7,6 +7,7 @@ import pytest
 from pg8000.dbapi import (
     BINARY,
     Binary,
+    DatabaseError,
     Date,
     DateFromTicks,
     Time,
@@ -212,3 +213,23 @@ def test_prepared_statement(con):
 
 def test_cursor_type(cursor):
     assert str(type(cursor)) == "<class 'pg8000.dbapi.Cursor'>"
+
+
+def test_implicit_begin(con):
+    cursor = con.cursor()
+    cursor.execute("SELECT txid_current_if_assigned()")
+    assert con._in_transaction
+    cursor.execute("CREATE TEMPORARY TABLE t_begin (f INTEGER) ON COMMIT DROP")
+    con.rollback()
+    cursor.execute("SELECT to_regclass('t_begin')")
+    assert cursor.fetchall() == ([None],)
+
+
+def test_implicit_begin_error(con):
+    cursor = con.cursor()
+    with pytest.raises(DatabaseError, match="t_begin"):
+        cursor.execute("SELECT * FROM t_begin")
+    assert con._in_transaction
+    con.rollback()
+    cursor.execute("SELECT 1")
+    assert cursor.fetchall() == ([1],)
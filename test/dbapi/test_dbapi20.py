@@ -560,12 +560,12 @@ def help_nextset_setUp(cur):
     that returns two result sets, first the
     number of rows in booze then "name from booze"
     """
-    raise NotImplementedError("Helper not implemented")
+    pytest.skip("A PostgreSQL procedure can't return more than one result set")
 
 
 def help_nextset_tearDown(cur):
     "If cleaning up is needed after nextSetTest"
-    raise NotImplementedError("Helper not implemented")
+    pass
 
 
 def test_nextset(cursor):
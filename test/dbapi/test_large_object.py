@@ -0,0 +1,14 @@
+from pg8000.large_object import LargeObject
+
+
+def test_large_object(con):
+    with LargeObject(con, mode="wb") as lo:
+        lo.write(b"Zarathustra")
+        oid = lo.oid
+    assert con._in_transaction
+    con.commit()
+
+    with LargeObject(con, oid) as lo:
+        assert lo.read() == b"Zarathustra"
+        lo.unlink()
+    con.commit()
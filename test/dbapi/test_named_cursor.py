@@ -0,0 +1,117 @@
+import pytest
+
+from pg8000.core import IN_TRANSACTION
+from pg8000.dbapi import NamedCursor, ProgrammingError
+
+
+def _cursors(con):
+    cursor = con.cursor()
+    cursor.execute("SELECT name FROM pg_cursors")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def test_named_cursor(con):
+    cursor = con.cursor(name="zarathustra", itersize=3)
+    assert isinstance(cursor, NamedCursor)
+
+    cursor.execute("SELECT * FROM generate_series(1, %s)", (7,))
+    assert cursor.description[0][0] == "generate_series"
+    assert cursor.rowcount == 3
+    assert cursor.fetchmany(4) == ([1], [2], [3], [4])
+    assert cursor.rowcount == 6
+    assert cursor.fetchall() == ([5], [6], [7])
+    assert cursor.fetchone() is None
+
+    cursor.close()
+    assert "zarathustra" not in _cursors(con)
+
+
+def test_named_cursor_execute_again(con):
+    cursor = con.cursor(name="zarathustra")
+    cursor.execute("SELECT 1")
+    cursor.execute("SELECT 2")
+    assert cursor.fetchall() == ([2],)
+
+
+def test_named_cursor_scroll(con):
+    cursor = con.cursor(name="zarathustra", scrollable=True, itersize=2)
+    cursor.execute("SELECT * FROM generate_series(1, 5)")
+    assert cursor.fetchmany(3) == ([1], [2], [3])
+
+    cursor.scroll(-2)
+    assert cursor.fetchone() == [2]
+
+    cursor.scroll(3, mode="absolute")
+    assert cursor.fetchall() == ([4], [5])
+
+    with pytest.raises(IndexError):
+        cursor.scroll(-1, mode="absolute")
+
+    with pytest.raises(ProgrammingError, match="Invalid scroll mode"):
+        cursor.scroll(1, mode="sideways")
+
+
+def test_named_cursor_withhold(con):
+    cursor = con.cursor(name="zarathustra", withhold=True)
+    cursor.execute("SELECT * FROM generate_series(1, 3)")
+    con.commit()
+    assert cursor.fetchall() == ([1], [2], [3])
+
+    cursor.close()
+    assert "zarathustra" not in _cursors(con)
+
+
+def test_named_cursor_close_after_commit(con):
+    cursor = con.cursor(name="zarathustra")
+    cursor.execute("SELECT 1")
+    con.commit()
+    assert _cursors(con) == []
+
+    # The server dropped the cursor at the end of its transaction
+    cursor.close()
+    con.commit()
+
+
+def test_named_cursor_scroll_forward(con):
+    cursor = con.cursor(name="zarathustra", itersize=3)
+    cursor.execute("SELECT * FROM generate_series(1, 10)")
+    assert cursor.fetchone() == [1]
+
+    cursor.scroll(1)
+    assert cursor.fetchone() == [3]
+
+    cursor.scroll(4)
+    assert cursor.fetchone() == [8]
+
+    with pytest.raises(ProgrammingError, match="scrollable"):
+        cursor.scroll(2, mode="absolute")
+    cursor.scroll(8, mode="absolute")
+    assert cursor.fetchall() == ([9], [10])
+
+    cursor.scroll(5)
+    assert cursor.fetchone() is None
+    assert con._transaction_status == IN_TRANSACTION
+
+
+def test_named_cursor_withhold_rolled_back(con):
+    cursor = con.cursor(name="zarathustra", withhold=True)
+    cursor.execute("SELECT 1")
+    con.rollback()
+    cursor.close()
+
+
+@pytest.mark.parametrize("commit", [True, False])
+def test_named_cursor_withhold_close_in_later_transaction(con, commit):
+    cursor = con.cursor(name="zarathustra", withhold=True)
+    cursor.execute("SELECT * FROM generate_series(1, 3)")
+    if commit:
+        con.commit()
+    else:
+        con.rollback()
+
+    assert _cursors(con) == (["zarathustra"] if commit else [])
+    assert con._transaction_status == IN_TRANSACTION
+    cursor.close()
+    assert _cursors(con) == []
+    assert con._transaction_status == IN_TRANSACTION
+    con.commit()
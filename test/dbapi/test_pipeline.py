@@ -0,0 +1,47 @@
+import pytest
+
+from pg8000.dbapi import DatabaseError, InterfaceError
+
+
+def test_pipeline(con):
+    with con.pipeline() as p:
+        number = p.execute("SELECT CAST(%s AS INTEGER) + 1", (1,))
+        p.execute("CREATE TEMPORARY TABLE t_pipeline (f INTEGER)")
+        insert = p.execute("INSERT INTO t_pipeline VALUES (%s), (%s)", (1, 2))
+        percent = p.execute("SELECT '%'")
+
+    assert number.rows == [[2]]
+    assert insert.row_count == 2
+    assert percent.rows == [["%"]]
+
+    # The statements are in a transaction
+    con.rollback()
+    cursor = con.cursor()
+    cursor.execute("SELECT to_regclass('t_pipeline')")
+    assert cursor.fetchall() == ([None],)
+
+
+def test_pipeline_error(con):
+    with pytest.raises(DatabaseError, match="t_none"):
+        with con.pipeline() as p:
+            p.execute("SELECT * FROM t_none")
+            p.sync()
+            after = p.execute("SELECT 1")
+
+    with pytest.raises(DatabaseError, match="aborted"):
+        after.rows
+    con.rollback()
+
+
+def test_pipeline_autocommit(con):
+    con.autocommit = True
+    with con.pipeline(isolate=True) as p:
+        handle = p.execute("SELECT 1")
+    assert handle.rows == [[1]]
+    assert not con._in_transaction
+
+    with pytest.raises(DatabaseError, match="division by zero"):
+        with con.pipeline() as p:
+            p.execute("SELECT 1 / 0")
+            skipped = p.execute("SELECT 1")
+    assert isinstance(skipped.error, InterfaceError)
@@ -1,4 +1,5 @@
 from datetime import datetime as Datetime, timezone as Timezone
+from io import BytesIO
 
 import pytest
 
@@ -321,3 +322,76 @@ def test_not_parsed_if_no_params(mocker, cursor):
     mock_convert_paramstyle = mocker.patch("pg8000.dbapi.convert_paramstyle")
     cursor.execute("ROLLBACK")
     mock_convert_paramstyle.assert_not_called()
+
+
+def test_execute_lazy(cursor):
+    cursor.execute("SELECT CAST(%s AS INTEGER), 'x'", (1,), lazy=True)
+    assert cursor.fetchall() == ([1, "x"],)
+
+
+def test_execute_memo(cursor):
+    cursor.execute("SELECT 'active' FROM generate_series(1, 2)", memo=True)
+    rows = cursor.fetchall()
+    assert rows == (["active"], ["active"])
+    assert rows[0][0] is rows[1][0]
+
+
+def test_execute_spill(cursor):
+    cursor.execute("SELECT generate_series(1, 100)", spill=100)
+    assert cursor.fetchone() == [1]
+    assert cursor.fetchall() == tuple([n] for n in range(2, 101))
+
+
+def test_nextset(cursor):
+    cursor.execute(
+        "SELECT 5; CREATE TEMPORARY TABLE t_nextset (f INTEGER); "
+        "SELECT 'Erich', 1 UNION ALL SELECT 'Fromm', 2"
+    )
+    assert cursor.description[0][0] == "?column?"
+    assert cursor.rowcount == 1
+    assert cursor.fetchall() == ([5],)
+
+    assert cursor.nextset() is True
+    assert cursor.description is None
+    assert cursor.rowcount == -1
+
+    assert cursor.nextset() is True
+    assert cursor.rowcount == 2
+    assert cursor.fetchone() == ["Erich", 1]
+    assert cursor.nextset() is None
+    assert cursor.fetchall() == (["Fromm", 2],)
+
+    cursor.execute("SELECT 1")
+    assert cursor.nextset() is None
+    assert cursor.fetchall() == ([1],)
+
+
+def test_multiple_statements(cursor):
+    cursor.execute("SET application_name TO 'pg8000'; SELECT 42")
+    assert cursor.description[0][0] == "?column?"
+    assert cursor.rowcount == 1
+    assert cursor.fetchall() == ([42],)
+    assert cursor.nextset() is None
+
+    cursor.execute(
+        "CREATE TEMPORARY TABLE t_multiple (f INTEGER); "
+        "INSERT INTO t_multiple VALUES (1), (2)"
+    )
+    assert cursor.description is None
+    assert cursor.rowcount == 2
+    with pytest.raises(pg8000.dbapi.ProgrammingError):
+        cursor.fetchall()
+
+
+def test_nextset_unexecuted(cursor):
+    with pytest.raises(pg8000.dbapi.ProgrammingError):
+        cursor.nextset()
+
+
+def test_execute_sinks(cursor):
+    payload = BytesIO()
+    cursor.execute(
+        "SELECT CAST(%s AS bytea) AS payload, 1", (b"Watt",), sinks={"payload": payload}
+    )
+    assert cursor.fetchall() == ([4, 1],)
+    assert payload.getvalue() == b"Watt"
@@ -0,0 +1,33 @@
+from pg8000.core import IDLE
+from pg8000.dbapi import connect
+from pg8000.router import Router
+
+
+def test_cursor(db_kwargs):
+    primary = connect(**db_kwargs)
+    replica = connect(**db_kwargs)
+    with Router(primary, [replica], pin_seconds=0) as router:
+        replica_cursor = replica.cursor()
+        replica_cursor.execute("SELECT pg_backend_pid()")
+        replica_pid = replica_cursor.fetchone()[0]
+        router.commit()
+
+        cursor = router.cursor()
+        cursor.execute("SELECT pg_backend_pid()")
+        assert cursor.fetchall() == ([replica_pid],)
+        assert replica._transaction_status == IDLE
+
+        cursor.execute("CREATE TEMPORARY TABLE book (title TEXT)")
+        cursor.executemany(
+            "INSERT INTO book VALUES (%s)", [("Molloy",), ("Malone Dies",)]
+        )
+        assert cursor.rowcount == 2
+
+        # The primary is in a transaction, so reads go to it
+        cursor.execute("SELECT title FROM book ORDER BY title")
+        assert cursor.fetchall() == (["Malone Dies"], ["Molloy"])
+        router.commit()
+
+        cursor.execute("SELECT pg_backend_pid()")
+        assert cursor.fetchone() == [replica_pid]
+        cursor.close()
@@ -0,0 +1,464 @@
+"""A stand-in for a PostgreSQL server that speaks enough of the protocol for pg8000 to
+connect to it and run queries, with scripted results and a configurable latency.
+
+    with FakeServer({"SELECT 1": Result([("?column?", INTEGER)], [[1]])}) as server:
+        con = pg8000.native.Connection("postgres", port=server.port)
+
+It supports trust, md5 and SCRAM-SHA-256 authentication, the simple and extended query
+protocols, and COPY FROM STDIN and COPY TO STDOUT.
+"""
+
+import re
+import socketserver
+import threading
+from hashlib import md5
+from os import urandom
+from time import sleep
+
+from scramp import ScramMechanism
+
+from test.wire import (
+    authentication_ok,
+    authentication_request,
+    backend_key_data,
+    bind_complete,
+    close_complete,
+    command_complete,
+    copy_data,
+    copy_done,
+    copy_in_response,
+    copy_out_response,
+    data_row,
+    empty_query_response,
+    error_response,
+    no_data,
+    parameter_description,
+    parameter_status,
+    parse_complete,
+    ready_for_query,
+    row_description,
+)
+
+from pg8000.converters import UNKNOWN
+from pg8000.core import (
+    BIND,
+    CLOSE,
+    COPY_DATA,
+    COPY_DONE,
+    DESCRIBE,
+    EXECUTE,
+    FLUSH,
+    H_unpack,
+    IDLE,
+    IN_FAILED_TRANSACTION,
+    IN_TRANSACTION,
+    NULL_BYTE,
+    PARSE,
+    QUERY,
+    STATEMENT,
+    SYNC,
+    TERMINATE,
+    ci_unpack,
+    i_unpack,
+)
+
+COPY_FAIL = b"f"
+
+SSL_REQUEST_CODE = 80877103
+GSS_ENC_REQUEST_CODE = 80877104
+
+
+class Result:
+    """The result of a statement.
+
+    - *columns* - A sequence of (name, type_oid) pairs.
+    - *rows* - A sequence of rows, or a function that's called with the list of
+      parameters (as bytes in the text format) and returns the rows. Each value in a
+      row is sent in the text format, with ``None`` meaning NULL.
+    - *tag* - The command tag. The default is ``SELECT <number of rows>``.
+    - *error* - If not ``None``, a (code, message) pair that's sent as an error instead
+      of the result.
+    """
+
+    def __init__(self, columns=(), rows=(), tag=None, error=None):
+        self.columns = columns
+        self.rows = rows
+        self.tag = tag
+        self.error = error
+
+    def get_rows(self, params):
+        rows = self.rows(params) if callable(self.rows) else self.rows
+        return [[_to_text(v) for v in row] for row in rows]
+
+
+def _to_text(v):
+    if v is None or isinstance(v, bytes):
+        return v
+    elif isinstance(v, bool):
+        return b"t" if v else b"f"
+    return str(v).encode()
+
+
+class _Error(Exception):
+    def __init__(self, code, message):
+        self.code = code
+        self.message = message
+
+
+class FakeServer:
+    """Runs a server in a background thread, listening on ``host`` and ``port``.
+
+    - *results* - A mapping of SQL statement to :class:`Result`, or a function that's
+      called with the SQL and returns a :class:`Result`.
+    - *auth* - One of ``trust``, ``md5`` or ``scram-sha-256``.
+    - *password* - The password that the client must give, if auth isn't ``trust``.
+    - *latency* - Seconds to wait before each reply is sent, to simulate the round trip
+      time of a network.
+    - *parameter_statuses* - Parameter statuses that are sent on startup as well as,
+      or instead of, the defaults. For example ``{"in_hot_standby": "on"}`` for a
+      standby.
+
+    The data received by each COPY FROM STDIN is appended to ``copied``.
+    """
+
+    def __init__(
+        self,
+        results=None,
+        auth="trust",
+        password=None,
+        latency=0,
+        parameter_statuses=None,
+    ):
+        self.results = {} if results is None else results
+        self.auth = auth
+        self.password = password
+        self.latency = latency
+        self.parameter_statuses = {
+            "client_encoding": "UTF8",
+            "server_version": "16.0",
+            "integer_datetimes": "on",
+            "DateStyle": "ISO, MDY",
+            "IntervalStyle": "postgres",
+        }
+        if parameter_statuses is not None:
+            self.parameter_statuses.update(parameter_statuses)
+        self.copied = []
+        self.connections = 0
+
+        # Like PostgreSQL, the salt and iteration count are kept with the password
+        if auth == "scram-sha-256":
+            self.scram_auth_info = ScramMechanism().make_auth_info(
+                password, iteration_count=4096
+            )
+
+        self._server = socketserver.ThreadingTCPServer(("localhost", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self.host, self.port = self._server.server_address
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.01,), daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def get_result(self, sql):
+        if callable(self.results):
+            return self.results(sql)
+
+        try:
+            return self.results[sql]
+        except KeyError:
+            pass
+
+        command = sql.strip().split(maxsplit=1)[0].upper() if sql.strip() else ""
+        if command in ("BEGIN", "START", "COMMIT", "ROLLBACK", "SET"):
+            return Result(tag="BEGIN" if command == "START" else command)
+        raise _Error("42P01", f"The fake server has no result for: {sql}")
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def setup(self):
+        self.fake = self.server.fake
+        self.fake.connections += 1
+        self.buf = bytearray()
+        self.out = bytearray()
+        self.status = IDLE
+        self.statements = {}
+        self.portals = {}
+        self.skip_to_sync = False
+
+    def recv_exactly(self, size):
+        while len(self.buf) < size:
+            self.send_pending()
+            block = self.request.recv(65536)
+            if block == b"":
+                raise EOFError()
+            self.buf.extend(block)
+        data = bytes(self.buf[:size])
+        del self.buf[:size]
+        return data
+
+    def send_pending(self):
+        """Sends the replies once all the messages that have arrived are handled."""
+        if len(self.out) > 0:
+            if self.fake.latency > 0:
+                sleep(self.fake.latency)
+            self.request.sendall(self.out)
+            self.out.clear()
+
+    def read_message(self):
+        code, length = ci_unpack(self.recv_exactly(5))
+        return code, self.recv_exactly(length - 4)
+
+    def handle(self):
+        try:
+            if not self.startup():
+                return
+            while True:
+                code, data = self.read_message()
+                if code == TERMINATE:
+                    return
+                self.handle_message(code, data)
+        except EOFError:
+            pass
+
+    def startup(self):
+        while True:
+            length = i_unpack(self.recv_exactly(4))[0]
+            data = self.recv_exactly(length - 4)
+            if i_unpack(data)[0] in (SSL_REQUEST_CODE, GSS_ENC_REQUEST_CODE):
+                self.request.sendall(b"N")
+            else:
+                break
+
+        fields = data[4:-2].split(NULL_BYTE)
+        params = dict(zip(fields[::2], fields[1::2]))
+        user = params[b"user"]
+
+        if not self.authenticate(user):
+            self.out.extend(
+                error_response(
+                    "28P01",
+                    f'password authentication failed for user "{user.decode()}"',
+                )
+            )
+            self.send_pending()
+            return False
+
+        self.out.extend(authentication_ok())
+        for name, value in self.fake.parameter_statuses.items():
+            self.out.extend(parameter_status(name, value))
+        self.out.extend(backend_key_data(1, 2))
+        self.out.extend(ready_for_query(self.status))
+        return True
+
+    def authenticate(self, user):
+        auth = self.fake.auth
+        password = self.fake.password
+        if auth == "trust":
+            return True
+
+        elif auth == "md5":
+            salt = urandom(4)
+            self.out.extend(authentication_request(5, salt))
+            _, data = self.read_message()
+            inner = md5(password.encode() + user).hexdigest().encode("ascii")
+            expected = b"md5" + md5(inner + salt).hexdigest().encode("ascii")
+            return data == expected + NULL_BYTE
+
+        elif auth == "scram-sha-256":
+            scram = ScramMechanism().make_server(
+                lambda username: self.fake.scram_auth_info
+            )
+            self.out.extend(authentication_request(10, b"SCRAM-SHA-256\x00\x00"))
+
+            _, data = self.read_message()
+            idx = data.index(NULL_BYTE) + 1
+            client_first = data[idx + 4 :].decode()
+            scram.set_client_first(client_first)
+            self.out.extend(
+                authentication_request(11, scram.get_server_first().encode())
+            )
+
+            _, data = self.read_message()
+            try:
+                scram.set_client_final(data.decode())
+            except Exception:
+                return False
+            self.out.extend(
+                authentication_request(12, scram.get_server_final().encode())
+            )
+            return True
+
+        raise ValueError(f"The auth {auth} isn't supported")
+
+    def handle_message(self, code, data):
+        if code == QUERY:
+            self.simple_query(data[:-1].decode())
+            self.out.extend(ready_for_query(self.status))
+
+        elif code == SYNC:
+            self.skip_to_sync = False
+            self.out.extend(ready_for_query(self.status))
+
+        elif code == FLUSH:
+            pass
+
+        elif self.skip_to_sync:
+            pass
+
+        else:
+            try:
+                self.extended_query(code, data)
+            except _Error as e:
+                self.error(e)
+                self.skip_to_sync = True
+
+    def error(self, e):
+        self.out.extend(error_response(e.code, e.message))
+        if self.status == IN_TRANSACTION:
+            self.status = IN_FAILED_TRANSACTION
+
+    def simple_query(self, sql):
+        if sql.strip() == "":
+            self.out.extend(empty_query_response())
+            return
+
+        try:
+            result = self.fake.get_result(sql)
+            if result.columns:
+                self.out.extend(row_description(result.columns))
+            self.execute(sql, result, [])
+        except _Error as e:
+            self.error(e)
+
+    def execute(self, sql, result, params):
+        if result.error is not None:
+            raise _Error(*result.error)
+
+        command = sql.strip().upper()
+        if command.startswith("COPY") and "FROM STDIN" in command:
+            self.copy_in(result)
+            return
+        elif command.startswith("COPY") and "TO STDOUT" in command:
+            self.copy_out(result, params)
+            return
+
+        rows = result.get_rows(params)
+        for row in rows:
+            self.out.extend(data_row(row))
+        tag = result.tag
+        if tag is None:
+            tag = f"SELECT {len(rows)}" if result.columns else "SELECT 0"
+        self.out.extend(command_complete(tag))
+
+        if tag in ("BEGIN", "START TRANSACTION"):
+            self.status = IN_TRANSACTION
+        elif tag in ("COMMIT", "ROLLBACK"):
+            self.status = IDLE
+
+    def copy_in(self, result):
+        self.out.extend(copy_in_response())
+        received = bytearray()
+        while True:
+            code, data = self.read_message()
+            if code == COPY_DATA:
+                received.extend(data)
+            elif code == COPY_DONE:
+                break
+            elif code == COPY_FAIL:
+                raise _Error("57014", "COPY from stdin failed")
+        self.fake.copied.append(bytes(received))
+        tag = result.tag
+        if tag is None:
+            tag = f"COPY {len(received.splitlines())}"
+        self.out.extend(command_complete(tag))
+
+    def copy_out(self, result, params):
+        self.out.extend(copy_out_response())
+        rows = result.get_rows(params)
+        for row in rows:
+            line = b"\t".join(b"\\N" if v is None else v for v in row)
+            self.out.extend(copy_data(line + b"\n"))
+        self.out.extend(copy_done())
+        self.out.extend(command_complete(f"COPY {len(rows)}"))
+
+    def extended_query(self, code, data):
+        if code == PARSE:
+            idx = data.index(NULL_BYTE)
+            name = data[:idx]
+            end = data.index(NULL_BYTE, idx + 1)
+            sql = data[idx + 1 : end].decode()
+            num_oids = H_unpack(data, end + 1)[0]
+            oids = [i_unpack(data, end + 3 + 4 * i)[0] for i in range(num_oids)]
+            num_params = max(
+                [int(n) for n in re.findall(r"\$(\d+)", sql)] + [len(oids)]
+            )
+            oids.extend([UNKNOWN] * (num_params - len(oids)))
+            self.statements[name] = (sql, [UNKNOWN if o == 0 else o for o in oids])
+            self.out.extend(parse_complete())
+
+        elif code == DESCRIBE:
+            name = data[1:-1]
+            if data[:1] == STATEMENT:
+                sql, oids = self.statements[name]
+                self.out.extend(parameter_description(oids))
+            else:
+                sql = self.portals[name][0]
+            result = self.fake.get_result(sql)
+            if result.columns:
+                self.out.extend(row_description(result.columns))
+            else:
+                self.out.extend(no_data())
+
+        elif code == BIND:
+            idx = data.index(NULL_BYTE)
+            portal = data[:idx]
+            end = data.index(NULL_BYTE, idx + 1)
+            statement = data[idx + 1 : end]
+            idx = end + 1
+            num_formats = H_unpack(data, idx)[0]
+            idx += 2 + 2 * num_formats
+            num_params = H_unpack(data, idx)[0]
+            idx += 2
+            params = []
+            for _ in range(num_params):
+                length = i_unpack(data, idx)[0]
+                idx += 4
+                if length == -1:
+                    params.append(None)
+                else:
+                    params.append(data[idx : idx + length])
+                    idx += length
+            self.portals[portal] = (self.statements[statement][0], params)
+            self.out.extend(bind_complete())
+
+        elif code == EXECUTE:
+            portal = data[: data.index(NULL_BYTE)]
+            sql, params = self.portals[portal]
+            self.execute(sql, self.fake.get_result(sql), params)
+
+        elif code == CLOSE:
+            name = data[1:-1]
+            if data[:1] == STATEMENT:
+                self.statements.pop(name, None)
+            else:
+                self.portals.pop(name, None)
+            self.out.extend(close_complete())
+
+        else:
+            raise _Error("08P01", f"The fake server doesn't support message {code}")
@@ -10,3 +10,11 @@ def test_run(con):
 def test_run_with_no_results(con):
     ps = con.prepare("ROLLBACK")
     ps.run()
+
+
+def test_run_implicit_begin(con):
+    ps = con.prepare("SELECT 1")
+    ps.run()
+    assert con._in_transaction
+    con.rollback()
+    assert not con._in_transaction
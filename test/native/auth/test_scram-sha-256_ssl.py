@@ -51,3 +51,30 @@ def test_scram_sha_256_plus_ssl_False(setup, db_kwargs):
 
     with Connection(**db_kwargs) as con:
         assert not isinstance(con._usock, SSLSocket)
+
+
+def test_tls_session_reused(setup, db_kwargs):
+    db_kwargs["ssl_context"] = True
+    db_kwargs["database"] = DB
+
+    with Connection(**db_kwargs) as con:
+        assert con.tls_session_reused is False
+
+    with Connection(**db_kwargs) as con:
+        assert con.tls_session_reused is True
+
+
+def test_ssl_negotiation(setup, db_kwargs):
+    db_kwargs["database"] = DB
+
+    with Connection(**db_kwargs) as con:
+        assert con.ssl_negotiation == "postgres"
+
+
+def test_ssl_negotiation_direct(setup, db_kwargs):
+    db_kwargs["database"] = DB
+    db_kwargs["ssl_negotiation"] = "direct"
+
+    with Connection(**db_kwargs) as con:
+        assert con.run("SELECT 1") == [[1]]
+        assert con.ssl_negotiation in ("direct", "postgres")
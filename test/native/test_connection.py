@@ -165,6 +165,17 @@ def test_broken_pipe_flush(con, db_kwargs):
         assert str(e) == "network error"
 
 
+def test_handler_override(db_kwargs):
+    class NoticeConnection(Connection):
+        def handle_NOTICE_RESPONSE(self, data, context):
+            self.last_notice = data
+
+    with NoticeConnection(**db_kwargs) as con:
+        con.run("DO $$ BEGIN RAISE NOTICE 'Zarathustra'; END $$")
+        assert b"Zarathustra" in con.last_notice
+        assert len(con.notices) == 0
+
+
 def test_application_name(db_kwargs):
     app_name = "my test application name"
     db_kwargs["application_name"] = app_name
@@ -327,3 +338,92 @@ def test_parameter_statuses(con):
         pass
     con.run(f"set session authorization '{role_name}'")
     assert role_name == con.parameter_statuses["session_authorization"]
+
+
+def test_stats(con):
+    assert con.stats is None
+    stats = con.enable_stats()
+    assert con.enable_stats() is stats
+
+    sql = "SELECT generate_series(1, :v)"
+    con.run(sql, v=10)
+    assert stats.rows == 10
+    assert stats.messages[b"D"] == 10
+    assert stats.round_trips == 3
+    assert stats.bytes_sent > 0
+    assert stats.bytes_received > 0
+    assert stats.socket_time > 0
+    assert stats.converter_time > 0
+    assert sum(stats.latencies["SELECT generate_series(1, $1)"]) == 1
+
+    con.disable_stats()
+    assert con.stats is None
+    con.run(sql, v=10)
+    assert stats.rows == 10
+
+    stats.reset()
+    assert stats.rows == 0
+
+
+def test_listener(con):
+    class Listener:
+        def __init__(self):
+            self.events = []
+
+        def query_start(self, statement, param_count):
+            self.events.append(("query_start", statement, param_count))
+
+        def first_byte(self, statement, seconds):
+            self.events.append(("first_byte", statement))
+
+        def rows_decoded(self, statement, num_rows):
+            self.events.append(("rows_decoded", statement, num_rows))
+
+        def query_end(self, statement, row_count, timings):
+            self.events.append(("query_end", statement, row_count, sorted(timings)))
+
+        def query_error(self, statement, error, timings):
+            self.events.append(("query_error", statement, type(error)))
+
+    listener = Listener()
+    con.add_listener(listener)
+    sql = "SELECT generate_series(1, $1)"
+    con.run(sql, v=2)
+    assert listener.events == [
+        ("query_start", sql, 1),
+        ("first_byte", sql),
+        ("rows_decoded", sql, 2),
+        ("query_end", sql, 2, ["describe", "execute", "parse", "total"]),
+    ]
+
+    listener.events.clear()
+    with pytest.raises(DatabaseError):
+        con.run("SELECT * FROM t99")
+    assert listener.events == [
+        ("query_start", "SELECT * FROM t99", 0),
+        ("first_byte", "SELECT * FROM t99"),
+        ("query_error", "SELECT * FROM t99", DatabaseError),
+    ]
+
+    con.remove_listener(listener)
+    listener.events.clear()
+    con.run("SELECT 1")
+    assert listener.events == []
+
+
+@pytest.mark.parametrize("event", ["query_start", "first_byte", "query_end"])
+def test_listener_error(con, event):
+    class Listener:
+        pass
+
+    def fail(*args):
+        raise ValueError("listener failed")
+
+    listener = Listener()
+    setattr(listener, event, fail)
+    con.add_listener(listener)
+    with pytest.raises(ValueError, match="listener failed"):
+        con.run("SELECT 1")
+
+    con.remove_listener(listener)
+    assert con.run("SELECT 2") == [[2]]
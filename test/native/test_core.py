@@ -1,17 +1,47 @@
 from io import BytesIO
+from threading import Event
+from time import sleep
 
 import pytest
 
+from scramp import ScramClient
+
+from test.wire import (
+    command_complete,
+    connect,
+    error_response,
+    ready_for_query,
+    result,
+)
+
+import pg8000.core
+from pg8000.converters import INTEGER, PG_TYPES, PY_TYPES, string_in
 from pg8000.core import (
     Context,
     CoreConnection,
+    IDLE,
+    IN_TRANSACTION,
+    LazyRow,
+    MAX_LATENCY_STATEMENTS,
+    MEMO_SAMPLE_SIZE,
     NULL_BYTE,
     PASSWORD,
+    QUERY,
+    SHARED_PG_TYPES,
+    SHARED_PY_TYPES,
+    SpilledRows,
+    Stats,
     _create_message,
+    _default_ssl_context,
     _make_socket,
+    _memoize,
     _read,
+    _save_tls_session,
+    _scram_client_final,
+    connect_hosts,
+    i_pack,
 )
-from pg8000.native import InterfaceError
+from pg8000.native import DatabaseError, InterfaceError
 
 
 def test_make_socket(mocker):
@@ -28,6 +58,131 @@ def test_make_socket(mocker):
     )
 
 
+def test_make_socket_tls_session(mocker):
+    """The TLS session of the last connection is offered to the server"""
+    mocker.patch("scramp.make_channel_binding")
+    ssl_context = mocker.Mock()
+    sock = mocker.Mock()
+    sock.recv.return_value = b"S"
+
+    def make_socket(port):
+        _make_socket(None, sock, "localhost", port, None, None, True, ssl_context)
+        return ssl_context.wrap_socket.call_args.kwargs["session"]
+
+    assert make_socket(5432) is None
+
+    ssl_sock = mocker.Mock(context=ssl_context)
+    _save_tls_session(ssl_sock, "localhost", 5432)
+    assert make_socket(5432) is ssl_sock.session
+    assert make_socket(5433) is None
+
+
+def test_make_socket_direct_ssl(mocker):
+    mocker.patch("scramp.make_channel_binding")
+    ssl_context = mocker.Mock()
+    ssl_context.wrap_socket.return_value.selected_alpn_protocol.return_value = (
+        "postgresql"
+    )
+    sock = mocker.Mock()
+    _, ssl_sock, negotiation = _make_socket(
+        None, sock, "localhost", 5432, None, None, True, ssl_context, "direct"
+    )
+    assert negotiation == "direct"
+    assert ssl_sock is ssl_context.wrap_socket.return_value
+    ssl_context.set_alpn_protocols.assert_not_called()
+    sock.sendall.assert_not_called()
+
+
+def test_default_ssl_context_direct():
+    """Direct SSL negotiation has a default context of its own, so that setting its
+    ALPN protocol doesn't affect other connections"""
+    assert _default_ssl_context(True) is _default_ssl_context(True)
+    assert _default_ssl_context(True) is not _default_ssl_context()
+
+
+def test_connect_hosts_doesnt_wait(mocker):
+    """The first matching connection is returned without waiting for the other
+    attempts, and the other connections are closed when their attempts finish"""
+    slow_started = Event()
+    release = Event()
+    cons = {"fast": mocker.Mock(), "slow": mocker.Mock()}
+
+    def connect(host, port, timeout):
+        if host == "slow":
+            slow_started.set()
+            release.wait()
+        return cons[host]
+
+    assert connect_hosts(connect, ["fast", "slow"], 5432) is cons["fast"]
+    assert slow_started.wait(5)
+    cons["slow"].close.assert_not_called()
+
+    release.set()
+    for _ in range(500):
+        if cons["slow"].close.called:
+            break
+        sleep(0.01)
+    cons["slow"].close.assert_called_once_with()
+    cons["fast"].close.assert_not_called()
+
+
+def test_make_socket_direct_ssl_fallback(mocker):
+    """If the server doesn't support direct SSL, a new socket is opened and an
+    SSLRequest is sent"""
+    mocker.patch("scramp.make_channel_binding")
+    socks = [mocker.Mock(), mocker.Mock()]
+    socks[1].recv.return_value = b"S"
+    mocker.patch("socket.create_connection", side_effect=socks)
+    ssl_context = mocker.Mock()
+    ssl_sock = mocker.Mock()
+    ssl_context.wrap_socket.side_effect = [OSError("wrong version number"), ssl_sock]
+
+    _, sock, negotiation = _make_socket(
+        None, None, "localhost", 5432, None, None, True, ssl_context, "direct"
+    )
+    assert negotiation == "postgres"
+    assert sock is ssl_sock
+    socks[0].close.assert_called_once_with()
+    socks[0].sendall.assert_not_called()
+    socks[1].sendall.assert_called_once()
+
+
+def test_make_socket_direct_ssl_sock(mocker):
+    """There's no fallback if the socket is given"""
+    ssl_context = mocker.Mock()
+    ssl_context.wrap_socket.side_effect = OSError("wrong version number")
+    with pytest.raises(InterfaceError, match="Direct SSL negotiation failed"):
+        _make_socket(
+            None,
+            mocker.Mock(),
+            "localhost",
+            5432,
+            None,
+            None,
+            True,
+            ssl_context,
+            "direct",
+        )
+
+
+@pytest.mark.parametrize(
+    "ssl_context,ssl_negotiation", [(None, "indirect"), (False, "direct")]
+)
+def test_make_socket_ssl_negotiation_invalid(mocker, ssl_context, ssl_negotiation):
+    with pytest.raises(InterfaceError, match="ssl_negotiation"):
+        _make_socket(
+            None,
+            mocker.Mock(),
+            "localhost",
+            5432,
+            None,
+            None,
+            True,
+            ssl_context,
+            ssl_negotiation,
+        )
+
+
 def test_handle_AUTHENTICATION_3(mocker):
     """Shouldn't send a FLUSH message, as FLUSH only used in extended-query"""
 
@@ -42,6 +197,102 @@ def test_handle_AUTHENTICATION_3(mocker):
     assert buf.getvalue() == _create_message(PASSWORD, password + NULL_BYTE)
 
 
+def test_shared_registries():
+    con = connect()
+    other_con = connect()
+    assert con.pg_types is SHARED_PG_TYPES
+    assert con.py_types is SHARED_PY_TYPES
+    assert "message_types" not in vars(con)
+    assert con.pg_types[0] is string_in
+    with pytest.raises(TypeError):
+        con.pg_types[INTEGER] = str
+    with pytest.raises(TypeError):
+        con.py_types[bytes] = str
+
+    con.register_in_adapter(INTEGER, str)
+    con.register_out_adapter(bytes, str)
+    assert con.pg_types[INTEGER] is str
+    assert con.py_types[bytes] is str
+    assert con.pg_types[0] is string_in
+    assert other_con.pg_types is SHARED_PG_TYPES
+    assert other_con.py_types is SHARED_PY_TYPES
+    assert SHARED_PG_TYPES[INTEGER] is int
+    assert PG_TYPES[INTEGER] is int
+    assert PY_TYPES[bytes] is not str
+
+
+def test_execute_simple_begin(mocker):
+    """The BEGIN is sent in the same flush as the statement"""
+    con = connect()
+    flush = mocker.spy(pg8000.core, "_flush")
+    sock = con._usock
+    sock.sent.seek(0)
+    sock.sent.truncate()
+    sock.load(
+        command_complete("BEGIN")
+        + ready_for_query(IN_TRANSACTION)
+        + result([("x", INTEGER)], [[b"1"]])
+        + ready_for_query(IN_TRANSACTION)
+    )
+
+    context = con.execute_simple("SELECT 1", begin=True)
+
+    assert context.rows == [[1]]
+    assert con._transaction_status == IN_TRANSACTION
+    assert flush.call_count == 1
+    assert sock.sent.getvalue() == _create_message(
+        QUERY, b"begin transaction" + NULL_BYTE
+    ) + _create_message(QUERY, b"SELECT 1" + NULL_BYTE)
+
+
+def test_execute_simple_begin_error():
+    """An error in the BEGIN is raised once the statement's response has been read"""
+    con = connect()
+    con._usock.load(
+        error_response("XX000", "begin failed")
+        + ready_for_query(IDLE)
+        + error_response("XX000", "select failed")
+        + ready_for_query(IDLE)
+    )
+
+    with pytest.raises(DatabaseError, match="begin failed"):
+        con.execute_simple("SELECT 1", begin=True)
+
+    con._usock.load(result([("x", INTEGER)], [[b"2"]]) + ready_for_query())
+    assert con.execute_simple("SELECT 2").rows == [[2]]
+
+
+@pytest.mark.parametrize(
+    "mechanism,channel_binding",
+    [
+        ("SCRAM-SHA-256", None),
+        ("SCRAM-SHA-256", ("tls-server-end-point", b"binding")),
+        ("SCRAM-SHA-256-PLUS", ("tls-server-end-point", b"binding")),
+    ],
+)
+def test_scram_client_final(mechanism, channel_binding):
+    """The cached keys give the same messages as scramp"""
+
+    def make_client():
+        client = ScramClient(
+            [mechanism], "user", "cpsnow", channel_binding, c_nonce="nonce123"
+        )
+        client_first = client.get_client_first()
+        client.set_server_first("r=nonce123server,s=c2FsdA==,i=4096")
+        return client, client_first[: -len(client.client_first_bare)]
+
+    cache = {}
+    for _ in range(2):
+        client, gs2_header = make_client()
+        client_final, server_signature = _scram_client_final(
+            client, cache, b"user", b"cpsnow", gs2_header, channel_binding
+        )
+        scramp_client, _ = make_client()
+        assert client_final == scramp_client.get_client_final()
+        assert server_signature == scramp_client.server_signature
+    assert len(cache) == 1
+
+
 def test_create_message():
     msg = _create_message(PASSWORD, "barbour".encode("utf8") + NULL_BYTE)
     assert msg == b"p\x00\x00\x00\x0cbarbour\x00"
@@ -64,3 +315,123 @@ def test_read(mocker):
     mock_socket.read = mocker.Mock(return_value=b"")
     with pytest.raises(InterfaceError, match="network error"):
         _read(mock_socket, 5)
+
+
+def test_handle_DATA_ROW(mocker):
+    """Raw input functions are passed bytes, the others are passed a str"""
+
+    mocker.patch.object(CoreConnection, "__init__", lambda x: None)
+    con = CoreConnection()
+    con._client_encoding = "utf8"
+    vals = [b"42", None, "\u0173".encode("utf8")]
+    data = b"\x00\x03" + b"".join(
+        i_pack(-1) if v is None else i_pack(len(v)) + v for v in vals
+    )
+    context = Context(None, columns=[], input_funcs=[int, int, repr])
+    assert context.raw_inputs == [True, True, False]
+    CoreConnection.handle_DATA_ROW(con, data, context)
+    assert context.rows == [[42, None, "'\u0173'"]]
+
+
+def test_lazy_row(mocker):
+    vals = [b"42", None, b"abc"]
+    data = b"\x00\x03" + b"".join(
+        i_pack(-1) if v is None else i_pack(len(v)) + v for v in vals
+    )
+    str_in = mocker.Mock(side_effect=str.upper)
+    row = LazyRow(data, [int, int, str_in], [True, True, False], "utf8")
+
+    assert len(row) == 3
+    assert row[0] == 42
+    str_in.assert_not_called()
+    assert row[-1] == "ABC"
+    assert row[2] == "ABC"
+    str_in.assert_called_once_with("abc")
+    assert row[1] is None
+    assert row[1:] == [None, "ABC"]
+    assert row == [42, None, "ABC"]
+    assert repr(row) == "[42, None, 'ABC']"
+    with pytest.raises(IndexError):
+        row[3]
+
+
+def test_spilled_rows():
+    def make_data_row(val):
+        return b"\x00\x01" + i_pack(len(val)) + val
+
+    context = Context(None, columns=[], input_funcs=[int], spill=12)
+    assert isinstance(context.rows, SpilledRows)
+    con = CoreConnection.__new__(CoreConnection)
+    con._client_encoding = "utf8"
+    for val in (b"1", b"22", b"333"):
+        con.handle_DATA_ROW(make_data_row(val), context)
+
+    rows = context.rows
+    assert len(rows._rows) == 1
+    assert len(rows) == 3
+    assert rows[-1] == [333]
+    assert rows[1:] == [[22], [333]]
+    assert rows == [[1], [22], [333]]
+    with pytest.raises(IndexError):
+        rows[3]
+    rows.close()
+
+
+def test_memoize(mocker):
+    func = mocker.Mock(side_effect=str.upper)
+    memo_in = _memoize(func, False, "utf8")
+    first = memo_in(b"active")
+    assert first == "ACTIVE"
+    assert memo_in(b"active") is first
+    func.assert_called_once_with("active")
+
+
+def test_memoize_low_hit_rate(mocker):
+    func = mocker.Mock(side_effect=int)
+    memo_in = _memoize(func, True, "utf8")
+    for i in range(MEMO_SAMPLE_SIZE):
+        memo_in(str(i).encode("ascii"))
+    func.reset_mock()
+    memo_in(b"1")
+    memo_in(b"1")
+    assert func.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "convert",
+    [
+        lambda v: [v],
+        lambda v: (v, [v]),
+        # Hashable, but still mutable
+        lambda v: type("Adapted", (), {"v": v})(),
+    ],
+)
+def test_memoize_mutable(mocker, convert):
+    func = mocker.Mock(side_effect=convert)
+    memo_in = _memoize(func, False, "utf8")
+    assert memo_in(b"a") is not memo_in(b"a")
+
+
+def test_memoize_tuple(mocker):
+    func = mocker.Mock(side_effect=lambda v: (v, 1))
+    memo_in = _memoize(func, False, "utf8")
+    assert memo_in(b"a") is memo_in(b"a")
+
+
+def test_stats_latencies_capped():
+    stats = Stats()
+    for i in range(MAX_LATENCY_STATEMENTS):
+        stats.add_latency(f"SELECT {i}", 0)
+    stats.add_latency("SELECT 0", 0.002)
+    stats.add_latency("SELECT x", 0)
+
+    assert len(stats.latencies) == MAX_LATENCY_STATEMENTS
+    assert "SELECT 1" not in stats.latencies
+    assert stats.latencies["SELECT 0"][:2] == [1, 1]
+
+
+def test_context_not_timed():
+    context = Context(None)
+    context.end_phase("execute")
+    assert context.start is None
+    assert context.timings == {}
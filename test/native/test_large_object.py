@@ -0,0 +1,94 @@
+import shutil
+from io import BytesIO
+
+import pytest
+
+from pg8000.large_object import LargeObject
+from pg8000.native import DatabaseError, InterfaceError
+
+
+@pytest.fixture
+def tcon(con):
+    con.run("START TRANSACTION")
+    return con
+
+
+def test_copyfileobj(tcon):
+    data = bytes(range(256)) * 1000
+    with LargeObject(tcon, mode="wb", chunk_size=1000) as lo:
+        shutil.copyfileobj(BytesIO(data), lo)
+        oid = lo.oid
+
+    out = BytesIO()
+    with LargeObject(tcon, oid, chunk_size=7000) as lo:
+        shutil.copyfileobj(lo, out, 10000)
+    assert out.getvalue() == data
+
+
+def test_read_write(tcon):
+    with LargeObject(tcon, mode="w+b", chunk_size=3) as lo:
+        assert lo.write(b"Ecce Homo") == 9
+        assert lo.tell() == 9
+        assert lo.seek(5) == 5
+        assert lo.read(2) == b"Ho"
+        assert lo.seek(-2, 2) == 7
+        assert lo.read() == b"mo"
+        assert lo.read() == b""
+        lo.seek(0)
+        b = bytearray(4)
+        assert lo.readinto(b) == 4
+        assert b == b"Ecce"
+        assert lo.truncate(4) == 4
+        oid = lo.oid
+
+    with LargeObject(tcon, oid, "ab") as lo:
+        lo.write(b" Mundi")
+    with LargeObject(tcon, oid) as lo:
+        assert lo.read() == b"Ecce Mundi"
+        with pytest.raises(InterfaceError, match="writing"):
+            lo.write(b"x")
+
+    with LargeObject(tcon, oid, "wb") as lo:
+        with pytest.raises(InterfaceError, match="reading"):
+            lo.read()
+    with LargeObject(tcon, oid) as lo:
+        assert lo.read() == b""
+
+
+def test_unlink(tcon):
+    lo = LargeObject(tcon)
+    lo.unlink()
+    assert lo.closed
+    with pytest.raises(DatabaseError, match="does not exist"):
+        LargeObject(tcon, lo.oid)
+
+
+def test_closed(tcon):
+    lo = LargeObject(tcon)
+    lo.close()
+    with pytest.raises(ValueError):
+        lo.read()
+
+
+def test_transaction_ended(tcon):
+    lo = LargeObject(tcon, mode="w+b")
+    tcon.run("COMMIT")
+    tcon.run("START TRANSACTION")
+    other = LargeObject(tcon, mode="w+b")
+    other.write(b"Dream of Fair to Middling Women")
+
+    with pytest.raises(InterfaceError, match="transaction of the large object"):
+        lo.read()
+    lo.close()
+    assert other.tell() == 31
+    other.close()
+
+
+def test_no_transaction(con):
+    with pytest.raises(InterfaceError, match="transaction"):
+        LargeObject(con)
+
+
+def test_invalid_mode(tcon):
+    with pytest.raises(InterfaceError, match="Invalid mode"):
+        LargeObject(tcon, mode="rt")
@@ -0,0 +1,61 @@
+import pytest
+
+from pg8000.native import DatabaseError, InterfaceError
+from pg8000.parallel import ParallelReader
+
+QUERY = "SELECT n FROM generate_series(CAST(:lo AS INTEGER), :hi) AS n"
+
+
+@pytest.fixture
+def reader(db_kwargs):
+    with ParallelReader(3, **db_kwargs) as reader:
+        yield reader
+
+
+def test_run(reader):
+    queries = [(QUERY, {"lo": i * 100 + 1, "hi": (i + 1) * 100}) for i in range(10)]
+    rows = reader.run(queries, batch_size=7)
+    assert sorted(row[0] for row in rows) == list(range(1, 1001))
+
+
+def test_partitions(reader):
+    odds, letters = reader.partitions([(QUERY, {"lo": 1, "hi": 3}), "SELECT 'a'"])
+    assert list(letters) == [["a"]]
+    assert list(odds) == [[1], [2], [3]]
+
+
+def test_partitions_too_many(reader):
+    with pytest.raises(InterfaceError, match="4 queries but only 3 connections"):
+        reader.partitions(["SELECT 1"] * 4)
+
+
+def test_snapshot(reader, con):
+    con.run("CREATE TEMPORARY TABLE IF NOT EXISTS t (n INTEGER)")
+    rows = reader.run(["SELECT count(*) FROM pg_class WHERE relname = 't'"] * 3)
+    assert list(rows) == [[0], [0], [0]]
+
+
+def test_close(reader):
+    rows = reader.run(["SELECT generate_series(1, 10000000)"] * 3, batch_size=10)
+    assert len(next(rows)) == 1
+    rows.close()
+    assert list(rows) == []
+    assert sorted(reader.run(["SELECT 1", "SELECT 2"])) == [[1], [2]]
+
+
+def test_error(reader):
+    with pytest.raises(DatabaseError, match="division by zero"):
+        list(reader.run(["SELECT 1 / 0", "SELECT 1"]))
+
+    # The snapshot transactions survive the error
+    assert sorted(reader.run(["SELECT 1", "SELECT 2", "SELECT 3"])) == [[1], [2], [3]]
+
+
+def test_no_workers(db_kwargs):
+    with pytest.raises(InterfaceError, match="at least one worker"):
+        ParallelReader(0, **db_kwargs)
+
+
+def test_connect_error(db_kwargs):
+    with pytest.raises(InterfaceError):
+        ParallelReader(2, **dict(db_kwargs, port=1))
@@ -0,0 +1,70 @@
+import pytest
+
+import pg8000.core
+from pg8000.native import DatabaseError, InterfaceError, TEXT
+
+
+def test_pipeline(mocker, con):
+    flush = mocker.spy(pg8000.core, "_flush")
+    with con.pipeline() as p:
+        number = p.run("SELECT CAST(:v AS INTEGER) + 1 AS n", v=1)
+        text = p.run("SELECT :v AS t", v="Erich Fromm", types={"v": TEXT})
+        table = p.run("CREATE TEMPORARY TABLE t_pipeline (f INTEGER)")
+        insert = p.run("INSERT INTO t_pipeline VALUES (1), (2)")
+
+    assert flush.call_count == 1
+    assert number.rows == [[2]]
+    assert number.columns[0]["name"] == "n"
+    assert text.rows == [["Erich Fromm"]]
+    assert table.rows is None
+    assert insert.row_count == 2
+    assert con.run("SELECT count(*) FROM t_pipeline") == [[2]]
+
+
+def test_pipeline_error(con):
+    with pytest.raises(DatabaseError, match="t_none"):
+        with con.pipeline() as p:
+            before = p.run("CREATE TEMPORARY TABLE t_pipeline (f INTEGER)")
+            error = p.run("SELECT * FROM t_none")
+            skipped = p.run("SELECT 1")
+            p.sync()
+            after = p.run("SELECT 2")
+
+    assert before.row_count == -1
+    with pytest.raises(DatabaseError, match="t_none"):
+        error.rows
+    with pytest.raises(InterfaceError, match="Skipped"):
+        skipped.rows
+    assert after.rows == [[2]]
+
+    # The statements of a group are rolled back together
+    assert con.run("SELECT to_regclass('t_pipeline')") == [[None]]
+
+
+def test_pipeline_isolate(con):
+    with pytest.raises(DatabaseError, match="division by zero"):
+        with con.pipeline(isolate=True) as p:
+            error = p.run("SELECT 1 / 0")
+            after = p.run("SELECT 2")
+
+    assert isinstance(error.error, DatabaseError)
+    assert after.rows == [[2]]
+
+
+def test_pipeline_not_sent(con):
+    p = con.pipeline()
+    handle = p.run("SELECT 1")
+    with pytest.raises(InterfaceError, match="hasn't been sent"):
+        handle.rows
+    p.flush()
+    assert handle.rows == [[1]]
+
+
+def test_pipeline_exception(con):
+    with pytest.raises(ZeroDivisionError):
+        with con.pipeline() as p:
+            handle = p.run("SELECT 1")
+            1 / 0
+
+    assert not handle.done
+    assert con.run("SELECT 2") == [[2]]
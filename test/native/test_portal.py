@@ -0,0 +1,63 @@
+from heapq import merge
+from itertools import islice
+
+import pytest
+
+from pg8000.native import DatabaseError, InterfaceError
+
+
+def test_portal(con):
+    con.run("START TRANSACTION")
+    portal = con.portal(
+        "SELECT n, 'x' AS x FROM generate_series(1, :m) AS n", m=5, batch_size=2
+    )
+    assert [c["name"] for c in portal.columns] == ["n", "x"]
+    assert portal.row_count == 0
+    assert next(portal) == [1, "x"]
+    assert portal.row_count == 2
+    assert list(portal) == [[2, "x"], [3, "x"], [4, "x"], [5, "x"]]
+    assert portal.row_count == 5
+    assert list(portal) == []
+
+
+def test_portal_interleaved(con):
+    con.run("START TRANSACTION")
+    odds = con.portal("SELECT generate_series(1, 99, 2)", batch_size=7)
+    evens = con.portal("SELECT generate_series(2, 100, 2)", batch_size=10)
+    assert con.run("SELECT 'between'") == [["between"]]
+    assert [row[0] for row in merge(odds, evens)] == list(range(1, 101))
+
+
+def test_portal_names_reused(con):
+    con.run("START TRANSACTION")
+    with con.portal("SELECT generate_series(1, 10)", batch_size=1) as portal:
+        assert list(islice(portal, 2)) == [[1], [2]]
+    assert con._portal_nums == {b"pg8000_portal_0\x00"}
+
+    assert list(con.portal("SELECT 1")) == [[1]]
+    assert con._portal_nums == {b"pg8000_portal_0\x00"}
+    assert con.run("SELECT count(*) FROM pg_cursors") == [[1]]
+
+
+def test_portal_error(con):
+    con.run("START TRANSACTION")
+    portal = con.portal(
+        "SELECT 1 / (3 - n) FROM generate_series(1, 5) AS n", batch_size=1
+    )
+    assert next(portal) == [0]
+    with pytest.raises(DatabaseError, match="division by zero"):
+        list(portal)
+    assert list(portal) == []
+
+
+def test_portal_batch_size_placeholder(con):
+    con.run("START TRANSACTION")
+    with pytest.raises(InterfaceError, match="'batch_size' can't be used"):
+        con.portal("SELECT :batch_size", batch_size=2)
+
+    assert con.run("SELECT :batch_size", batch_size=2) == [["2"]]
+
+
+def test_portal_not_in_transaction(con):
+    with pytest.raises(InterfaceError, match="in a transaction"):
+        con.portal("SELECT 1")
@@ -1,7 +1,8 @@
-import pytest
+from io import BytesIO
 
-from pg8000.native import DatabaseError, to_statement
+import pytest
 
+from pg8000.native import DatabaseError, InterfaceError, to_statement
 
 # Tests relating to the basic operation of the database driver, driven by the
 # pg8000 custom interface.
@@ -194,6 +195,33 @@ def test_multiple_statements(con):
     assert con.run(statements) == [[5], ["Erich Fromm"]]
 
 
+def test_results(con):
+    con.run("SELECT 5, 6; CREATE TEMPORARY TABLE t_results (f INTEGER); SELECT 'a'")
+    first, second, third = con.results
+    assert [c["name"] for c in first.columns] == ["?column?", "?column?"]
+    assert first.rows == [[5, 6]]
+    assert first.row_count == 1
+    assert second.columns is None
+    assert second.rows is None
+    assert second.row_count == -1
+    assert third.rows == [["a"]]
+
+    con.run("SELECT n FROM generate_series(1, 3) AS n; SELECT 'b'", spill=0)
+    first, second = con.results
+    assert first.rows == [[1], [2], [3]]
+    assert first.rows[-1] == [3]
+    assert second.rows[:] == [["b"]]
+
+    con.run("SELECT CAST(:v AS INTEGER)", v=7)
+    (result,) = con.results
+    assert result.rows == [[7]]
+    assert result.row_count == 1
+
+
+def test_unexecuted_connection_results(con):
+    assert con.results is None
+
+
 def test_unexecuted_connection_row_count(con):
     assert con.row_count is None
 
@@ -239,3 +267,87 @@ def test_max_parameters(con):
 def test_pg_placeholder_style(con):
     rows = con.run("SELECT $1", title="A Time Of Hope")
     assert rows[0] == ["A Time Of Hope"]
+
+
+def test_run_lazy(con):
+    rows = con.run(
+        "SELECT 1, CAST(:v AS TEXT), NULL, '{\"a\": 1}'::json", v="x", lazy=True
+    )
+    row = rows[0]
+    assert row[1] == "x"
+    assert row == [1, "x", None, {"a": 1}]
+    a, b, c, d = row
+    assert d == {"a": 1}
+
+
+def test_run_lazy_simple(con):
+    assert con.run("SELECT 1, 'x'", lazy=True) == [[1, "x"]]
+
+
+def test_run_memo(con):
+    sql = "SELECT 'active', n, CAST(:v AS TEXT) FROM generate_series(1, 3) AS n"
+    rows = con.run(sql, v="x", memo=["text"])
+    assert rows == [["active", 1, "x"], ["active", 2, "x"], ["active", 3, "x"]]
+    assert rows[0][2] is rows[2][2]
+    assert rows[0][0] is not rows[2][0]
+
+    rows = con.run("SELECT 'active' FROM generate_series(1, 2)", memo=True)
+    assert rows[0][0] is rows[1][0]
+
+
+def test_run_spill(con):
+    sql = "SELECT n, 'x' FROM generate_series(1, :v) AS n"
+    expected = [[n, "x"] for n in range(1, 101)]
+    assert con.run(sql, v=100, spill=100) == expected
+    assert con.run("SELECT 1; SELECT 'a', 2", spill=0) == [[1], ["a", 2]]
+
+    ps = con.prepare(sql)
+    rows = ps.run(v=100, spill=0, lazy=True)
+    assert rows == expected
+    ps.close()
+
+
+def test_run_sinks(con):
+    data = bytes(range(256)) * 1000
+    payload = BytesIO()
+    body = BytesIO()
+    sql = (
+        "SELECT 1, CAST(:d AS bytea) AS payload, repeat('é', 100000) AS body, "
+        "CAST(NULL AS bytea) AS empty, 'tail'"
+    )
+    rows = con.run(sql, d=data, sinks={"payload": payload, "body": body, "empty": body})
+    assert rows == [[1, len(data), 200000, None, "tail"]]
+    assert payload.getvalue() == data
+    assert body.getvalue() == "é".encode() * 100000
+
+    ps = con.prepare("SELECT CAST(:d AS bytea) AS payload")
+    payload = BytesIO()
+    assert ps.run(d=b"Murphy", sinks={"payload": payload}) == [[6]]
+    assert payload.getvalue() == b"Murphy"
+    ps.close()
+
+
+def test_run_sinks_error(con):
+    class Sink:
+        def write(self, b):
+            raise OSError("No space left on device")
+
+    with pytest.raises(OSError, match="No space"):
+        con.run(
+            "SELECT CAST('\\x0102' AS bytea) AS payload, 2", sinks={"payload": Sink()}
+        )
+    assert con.run("SELECT 3") == [[3]]
+
+
+@pytest.mark.parametrize("kwargs", [{"lazy": True}, {"spill": 0}])
+def test_run_sinks_incompatible(con, kwargs):
+    with pytest.raises(InterfaceError, match="sinks can't be used"):
+        con.run("SELECT 1 AS payload", sinks={"payload": BytesIO()}, **kwargs)
+    assert con.run("SELECT 2") == [[2]]
+
+
+def test_run_sinks_stats(con):
+    stats = con.enable_stats()
+    con.run("SELECT 'Worstward Ho' AS payload, 1", sinks={"payload": BytesIO()})
+    assert stats.rows == 1
+    assert stats.converter_time > 0
@@ -0,0 +1,71 @@
+import pytest
+
+from pg8000.native import Connection, DatabaseError
+from pg8000.router import Router, is_read
+
+
+@pytest.mark.parametrize(
+    "sql,expected",
+    [
+        ("SELECT 1", True),
+        ("  select * from t", True),
+        ("(SELECT 1) UNION (SELECT 2)", True),
+        ("-- comment\nSELECT 1", True),
+        ("/* comment */ SHOW server_version", True),
+        ("VALUES (1)", True),
+        ("TABLE t", True),
+        ("SELECT * FROM t FOR UPDATE", False),
+        ("SELECT * FROM t FOR KEY SHARE", False),
+        ("SELECT * INTO s FROM t", False),
+        ("SELECT 1; DELETE FROM t", False),
+        ("WITH d AS (DELETE FROM t RETURNING *) SELECT * FROM d", False),
+        ("INSERT INTO t VALUES (1)", False),
+        ("BEGIN", False),
+        ("", False),
+    ],
+)
+def test_is_read(sql, expected):
+    assert is_read(sql) is expected
+
+
+def make_router(db_kwargs, **kwargs):
+    return Router(Connection(**db_kwargs), [Connection(**db_kwargs)], **kwargs)
+
+
+def pid(con):
+    return con.run("SELECT pg_backend_pid()")[0][0]
+
+
+def test_read(db_kwargs):
+    with make_router(db_kwargs) as router:
+        replica = router.replicas[0]
+        assert router.run("SELECT pg_backend_pid()") == [[pid(replica.connection)]]
+        assert replica.lag == 0
+        assert replica.rtt > 0
+
+
+def test_read_your_writes(db_kwargs):
+    with make_router(db_kwargs, pin_seconds=60) as router:
+        # Temporary tables are only visible to the session that creates them
+        router.run("CREATE TEMPORARY TABLE book (title TEXT)")
+        router.run("INSERT INTO book VALUES ('Mercier et Camier')")
+        assert router.run("SELECT title FROM book") == [["Mercier et Camier"]]
+
+    with make_router(db_kwargs, pin_seconds=0) as router:
+        router.run("CREATE TEMPORARY TABLE book (title TEXT)")
+        with pytest.raises(DatabaseError, match="42P01"):
+            router.run("SELECT title FROM book")
+
+
+def test_transaction(db_kwargs):
+    with make_router(db_kwargs, pin_seconds=0) as router:
+        router.run("START TRANSACTION")
+        assert router.run("SELECT pg_backend_pid()") == [[pid(router.primary)]]
+        router.run("ROLLBACK")
+        assert router.run("SELECT pg_backend_pid()") != [[pid(router.primary)]]
+
+
+def test_max_lag(db_kwargs):
+    with make_router(db_kwargs, max_lag=-1) as router:
+        assert router.replica() is None
+        assert router.run("SELECT pg_backend_pid()") == [[pid(router.primary)]]
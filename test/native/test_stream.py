@@ -0,0 +1,63 @@
+from itertools import islice
+
+import pytest
+
+from pg8000.native import DatabaseError
+
+
+def test_stream(con):
+    stream = con.stream("SELECT n, 'x' AS x FROM generate_series(1, :m) AS n", m=3)
+    assert [c["name"] for c in stream.columns] == ["n", "x"]
+    assert list(stream) == [[1, "x"], [2, "x"], [3, "x"]]
+    assert stream.row_count == 3
+    assert list(stream) == []
+
+
+def test_stream_simple(con):
+    assert list(con.stream("SELECT 1; SELECT 'a', 2")) == [[1], ["a", 2]]
+
+
+def test_stream_lazy(con):
+    (row,) = con.stream("SELECT CAST(:v AS INTEGER)", v=1, lazy=True)
+    assert row == [1]
+
+
+def test_stream_close(con):
+    with con.stream("SELECT generate_series(1, 100000)") as stream:
+        assert list(islice(stream, 2)) == [[1], [2]]
+    assert stream.row_count == 100000
+    assert list(stream) == []
+    assert con.run("SELECT 'after'") == [["after"]]
+
+
+def test_stream_drained_by_next_statement(con):
+    stream = con.stream("SELECT generate_series(1, 1000)")
+    assert next(stream) == [1]
+    assert con.run("SELECT 'after'") == [["after"]]
+    assert list(stream) == []
+
+
+def test_stream_error(con):
+    stream = con.stream("SELECT 1 / (3 - n) FROM generate_series(1, 5) AS n")
+    assert next(stream) == [0]
+    assert next(stream) == [1]
+    with pytest.raises(DatabaseError, match="division by zero"):
+        next(stream)
+    assert con.run("SELECT 'after'") == [["after"]]
+
+
+def test_stream_close_error(con):
+    stream = con.stream("SELECT 1 / (3 - n) FROM generate_series(1, 5) AS n")
+    assert next(stream) == [0]
+    with pytest.raises(DatabaseError, match="division by zero"):
+        stream.close()
+    assert con.run("SELECT 'after'") == [["after"]]
+
+
+def test_stream_error_drained_by_next_statement(con):
+    stream = con.stream("SELECT 1 / (3 - n) FROM generate_series(1, 5) AS n")
+    assert next(stream) == [0]
+    assert con.run("SELECT 'after'") == [["after"]]
+    with pytest.raises(DatabaseError, match="division by zero"):
+        next(stream)
+    assert list(stream) == []
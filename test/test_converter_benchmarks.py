@@ -0,0 +1,156 @@
+import tracemalloc
+from datetime import (
+    date as Date,
+    datetime as Datetime,
+    time as Time,
+    timedelta as Timedelta,
+    timezone as Timezone,
+)
+from decimal import Decimal
+from enum import Enum
+from ipaddress import IPv4Address, IPv4Network, IPv6Address, IPv6Network
+from random import Random
+from uuid import UUID
+
+import pytest
+
+from test.wire import TEXT_VALUES, type_oid
+
+from pg8000.converters import PG_TYPES, PY_TYPES, RAW_IN_FUNCS
+from pg8000.types import PGInterval, Range
+
+# Benchmarks of each of the converters in PG_TYPES and PY_TYPES. The nanoseconds per
+# value and the peak memory used are recorded in each benchmark's extra_info.
+
+NUM_VALUES = 1000
+
+rand = Random(1981)
+
+
+def _ints(low, high):
+    return [str(rand.randint(low, high)) for _ in range(NUM_VALUES)]
+
+
+# Text values for types where the values vary a lot. The other types use the value in
+# TEXT_VALUES.
+IN_VALUES = {
+    "BIGINT": _ints(-(2**63), 2**63 - 1),
+    "INTEGER": _ints(-(2**31), 2**31 - 1),
+    "SMALLINT": _ints(-(2**15), 2**15 - 1),
+    "FLOAT": [repr(rand.uniform(-1e9, 1e9)) for _ in range(NUM_VALUES)],
+    "NUMERIC": [
+        f"{rand.uniform(-1e6, 1e6):.{rand.randint(0, 6)}f}" for _ in range(100)
+    ],
+    "TEXT": ["x" * rand.randint(0, 200) for _ in range(100)],
+    "TIMESTAMP": [
+        str(Datetime(2000, 1, 1) + Timedelta(seconds=rand.randint(0, 10**9)))
+        for _ in range(100)
+    ],
+    "TIMESTAMPTZ": [
+        str(Datetime(2000, 1, 1) + Timedelta(seconds=rand.randint(0, 10**9))) + "+00"
+        for _ in range(100)
+    ],
+    "INTEGER_ARRAY": [
+        "{" + ",".join(_ints(0, 10**6)[: rand.randint(0, 50)]) + "}" for _ in range(100)
+    ],
+}
+
+# The text of intervals in each IntervalStyle, as given by the server
+INTERVALS = {
+    "postgres": ["1 year 2 mons 3 days 04:05:06", "-3 days +04:05:06.5", "1 day"],
+    "postgres_verbose": [
+        "@ 1 year 2 mons 3 days 4 hours 5 mins 6 secs",
+        "@ 3 days 4 hours",
+        "@ 1 day",
+    ],
+    "sql_standard": ["+1-2 +3 +4:05:06", "-3 4:05:06.5", "1 0:00:00"],
+    "iso_8601": ["P1Y2M3DT4H5M6S", "P-3DT4H5M6.5S", "P1D"],
+}
+
+
+class Colour(Enum):
+    RED = 1
+    GREEN = 2
+
+
+PY_VALUES = {
+    Date: [Date(2024, 3, 31), Date(1, 1, 1)],
+    Datetime: [
+        Datetime(2024, 3, 31, 4, 5, 6, 789000),
+        Datetime(2024, 3, 31, 4, 5, 6, tzinfo=Timezone.utc),
+    ],
+    Decimal: [Decimal("12345.6789"), Decimal("-0.001")],
+    Enum: [Colour.RED, Colour.GREEN],
+    IPv4Address: [IPv4Address("192.168.0.1")],
+    IPv6Address: [IPv6Address("::1")],
+    IPv4Network: [IPv4Network("10.0.0.0/8")],
+    IPv6Network: [IPv6Network("2001:db8::/32")],
+    PGInterval: [PGInterval(years=1, months=2, days=3, hours=4)],
+    Range: [
+        Range(1, 10),
+        Range(Date(2024, 1, 1), Date(2024, 2, 1)),
+        Range(is_empty=True),
+    ],
+    Time: [Time(4, 5, 6, 789000)],
+    Timedelta: [Timedelta(days=3, seconds=14706, microseconds=500000)],
+    UUID: [UUID("911460f2-1f43-fea2-3e2c-e01fd5b5069d")],
+    bool: [True, False],
+    bytearray: [bytearray(b"\x01\x02\xde\xad\xbe\xef")],
+    dict: [{"name": "Erich Fromm", "books": [1941, 1956], "living": False}],
+    float: [3.141592653589793, -1e-9],
+    type(None): [None],
+    bytes: [b"\x01\x02\xde\xad\xbe\xef" * 10],
+    str: ["The Fear of Freedom", ""],
+    int: [2147483647, -1, 0],
+    list: [[1, 2, 3, None], ["a", "b"], [[1, 2], [3, 4]]],
+    tuple: [(1, "Erich", True)],
+}
+
+
+def run_benchmark(benchmark, func, values):
+    def run():
+        for v in values:
+            func(v)
+
+    benchmark(run)
+    if benchmark.stats is not None:
+        benchmark.extra_info["ns_per_value"] = (
+            benchmark.stats.stats.mean * 1e9 / len(values)
+        )
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info["peak_bytes"] = peak
+
+
+def in_values(func, texts):
+    values = [t.encode() if func in RAW_IN_FUNCS else t for t in texts]
+    return (values * (NUM_VALUES // len(values) + 1))[:NUM_VALUES]
+
+
+def test_py_values_cover_py_types():
+    assert PY_VALUES.keys() == PY_TYPES.keys()
+
+
+@pytest.mark.parametrize("name", sorted(TEXT_VALUES))
+def test_in(benchmark, name):
+    func = PG_TYPES[type_oid(name)]
+    texts = IN_VALUES.get(name, [TEXT_VALUES[name]])
+    run_benchmark(benchmark, func, in_values(func, texts))
+
+
+@pytest.mark.parametrize("style", sorted(INTERVALS))
+def test_in_interval(benchmark, style):
+    func = PG_TYPES[type_oid("INTERVAL")]
+    run_benchmark(benchmark, func, in_values(func, INTERVALS[style]))
+
+
+@pytest.mark.parametrize("typ", PY_VALUES, ids=lambda typ: typ.__name__)
+def test_out(benchmark, typ):
+    values = PY_VALUES[typ]
+    values = (values * (NUM_VALUES // len(values) + 1))[:NUM_VALUES]
+    run_benchmark(benchmark, PY_TYPES[typ], values)
@@ -16,6 +16,8 @@ from pg8000.converters import (
     Range,
     array_out,
     array_string_escape,
+    bool_raw_in,
+    bytes_raw_in,
     date_in,
     datemultirange_in,
     identifier,
@@ -55,6 +57,28 @@ def test_null_out():
     assert null_out(None) is None
 
 
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        [b"t", True],
+        [b"f", False],
+    ],
+)
+def test_bool_raw_in(value, expected):
+    assert bool_raw_in(value) is expected
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        [b"\\x", b""],
+        [b"\\x00ff68656c6c6f", b"\x00\xffhello"],
+    ],
+)
+def test_bytes_raw_in(value, expected):
+    assert bytes_raw_in(value) == expected
+
+
 @pytest.mark.parametrize(
     "array,out",
     [
@@ -0,0 +1,109 @@
+import hashlib
+from io import BytesIO
+from time import perf_counter
+
+import pytest
+
+from test.fake_server import FakeServer, Result
+
+import pg8000.dbapi
+import pg8000.native
+from pg8000.converters import INTEGER, TEXT
+
+RESULTS = {
+    "SELECT 1": Result([("?column?", INTEGER)], [[1]]),
+    "SELECT $1::int, 'x'": Result(
+        [("int4", INTEGER), ("?column?", TEXT)], lambda params: [[params[0], "x"]]
+    ),
+    "SELECT nothing": Result(error=("42703", 'column "nothing" does not exist')),
+    "COPY t FROM STDIN": Result(),
+    "COPY t TO STDOUT": Result(rows=[[1, "a"], [2, None]]),
+}
+
+
+@pytest.fixture
+def server():
+    with FakeServer(RESULTS) as server:
+        yield server
+
+
+@pytest.mark.parametrize("auth", ["trust", "md5", "scram-sha-256"])
+def test_auth(auth):
+    with FakeServer(RESULTS, auth=auth, password="cpsnow") as server:
+        with pg8000.native.Connection(
+            "postgres", port=server.port, password="cpsnow"
+        ) as con:
+            assert con.run("SELECT 1") == [[1]]
+
+
+@pytest.mark.parametrize("auth", ["md5", "scram-sha-256"])
+def test_auth_wrong_password(auth):
+    with FakeServer(RESULTS, auth=auth, password="cpsnow") as server:
+        with pytest.raises(pg8000.native.DatabaseError, match="28P01"):
+            pg8000.native.Connection("postgres", port=server.port, password="wrong")
+
+
+def test_scram_cache(mocker):
+    pg8000.native.enable_scram_cache()
+    try:
+        with FakeServer(RESULTS, auth="scram-sha-256", password="cpsnow") as server:
+            pbkdf2_hmac = mocker.patch("hashlib.pbkdf2_hmac", wraps=hashlib.pbkdf2_hmac)
+            for _ in range(3):
+                with pg8000.native.Connection(
+                    "postgres", port=server.port, password="cpsnow"
+                ) as con:
+                    assert con.run("SELECT 1") == [[1]]
+
+            with pytest.raises(pg8000.native.DatabaseError, match="28P01"):
+                pg8000.native.Connection("postgres", port=server.port, password="x")
+    finally:
+        pg8000.native.disable_scram_cache()
+
+    # The keys are derived once for each password
+    assert pbkdf2_hmac.call_count == 2
+
+
+def test_native(server):
+    con = pg8000.native.Connection("postgres", port=server.port)
+    assert con.run("SELECT 1") == [[1]]
+    assert con.run("SELECT :v::int, 'x'", v=5) == [[5, "x"]]
+    with pytest.raises(pg8000.native.DatabaseError, match="42703"):
+        con.run("SELECT nothing")
+    assert con.run("SELECT 1") == [[1]]
+
+    ps = con.prepare("SELECT :v::int, 'x'")
+    assert ps.run(v=6) == [[6, "x"]]
+    ps.close()
+    con.close()
+
+
+def test_dbapi(server):
+    con = pg8000.dbapi.connect("postgres", port=server.port)
+    cur = con.cursor()
+    cur.execute("SELECT %s::int, 'x'", (5,))
+    assert cur.fetchall() == ([5, "x"],)
+    cur.execute("SELECT 1")
+    assert cur.fetchall() == ([1],)
+    con.commit()
+    con.close()
+
+
+def test_copy(server):
+    con = pg8000.native.Connection("postgres", port=server.port)
+    con.run("COPY t FROM STDIN", stream=BytesIO(b"1\ta\n2\tb\n"))
+    assert server.copied == [b"1\ta\n2\tb\n"]
+    assert con.row_count == 2
+
+    stream = BytesIO()
+    con.run("COPY t TO STDOUT", stream=stream)
+    assert stream.getvalue() == b"1\ta\n2\t\\N\n"
+    con.close()
+
+
+def test_latency():
+    with FakeServer(RESULTS, latency=0.05) as server:
+        con = pg8000.native.Connection("postgres", port=server.port)
+        start = perf_counter()
+        con.run("SELECT 1")
+        assert perf_counter() - start >= 0.05
+        con.close()
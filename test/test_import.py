@@ -0,0 +1,35 @@
+import subprocess
+import sys
+
+import pytest
+
+# Modules that are slow to import, and so are only imported by pg8000 when they're
+# needed
+LAZY_MODULES = (
+    "dateutil.parser",
+    "hashlib",
+    "importlib.metadata",
+    "scramp",
+    "tempfile",
+)
+
+
+def imported_modules(code):
+    out = subprocess.run(
+        [sys.executable, "-c", code + "\nimport sys\nprint(' '.join(sys.modules))"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return set(out.split())
+
+
+@pytest.mark.parametrize("module", ["pg8000", "pg8000.native", "pg8000.dbapi"])
+def test_lazy_imports(module):
+    modules = imported_modules(f"import {module}")
+    assert modules.isdisjoint(LAZY_MODULES)
+
+
+def test_version():
+    modules = imported_modules("import pg8000; assert pg8000.__version__")
+    assert "importlib.metadata" in modules
@@ -0,0 +1,105 @@
+import sys
+import tracemalloc
+
+import pytest
+
+from test.wire import (
+    TEXT_VALUES,
+    bind_complete,
+    connect,
+    parameter_description,
+    parse_complete,
+    ready_for_query,
+    result,
+    row_description,
+    type_oid,
+)
+
+from pg8000.converters import PG_TYPES
+
+# Benchmarks of the handling of messages by pg8000 that don't need a PostgreSQL server.
+# A synthetic stream of messages is served to the connection from memory, so the
+# results only depend on pg8000.
+
+NUM_ROWS = 1000
+NUM_COLUMNS = 5
+
+# Tracing memory allocations is slow, so it's done with fewer rows
+NUM_TRACED_ROWS = 100
+
+
+def run_benchmark(benchmark, con, execute, make_stream):
+    """Runs the benchmark, and adds the rows per second, and the number of memory
+    blocks and peak bytes allocated per row, to the benchmark's extra_info.
+    """
+    stream = make_stream(NUM_ROWS)
+
+    def run():
+        con._usock.load(stream)
+        return execute()
+
+    context = benchmark(run)
+    assert len(context.rows) == NUM_ROWS
+    if benchmark.stats is not None:
+        benchmark.extra_info["rows_per_sec"] = NUM_ROWS / benchmark.stats.stats.mean
+
+    con._usock.load(make_stream(NUM_TRACED_ROWS))
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    try:
+        context = execute()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    retained_blocks = sys.getallocatedblocks() - blocks
+    benchmark.extra_info["blocks_per_row"] = retained_blocks / NUM_TRACED_ROWS
+    benchmark.extra_info["peak_bytes_per_row"] = peak / NUM_TRACED_ROWS
+
+
+def test_connect(benchmark):
+    benchmark(connect)
+
+    blocks = sys.getallocatedblocks()
+    con = connect()
+    benchmark.extra_info["blocks_per_connection"] = sys.getallocatedblocks() - blocks
+    con.close()
+
+
+def test_text_values_cover_pg_types():
+    assert {type_oid(name) for name in TEXT_VALUES} == PG_TYPES.keys()
+
+
+@pytest.mark.parametrize("name", sorted(TEXT_VALUES))
+def test_data_rows(benchmark, name):
+    oid = type_oid(name)
+    columns = [(f"column{i}", oid) for i in range(NUM_COLUMNS)]
+    row = [TEXT_VALUES[name].encode()] * NUM_COLUMNS
+    con = connect()
+
+    def make_stream(num_rows):
+        return result(columns, [row] * num_rows) + ready_for_query()
+
+    run_benchmark(benchmark, con, lambda: con.execute_simple("SELECT"), make_stream)
+
+
+def test_extended_query(benchmark):
+    columns = [(f"column{i}", type_oid("INTEGER")) for i in range(NUM_COLUMNS)]
+    con = connect()
+
+    def make_stream(num_rows):
+        return b"".join(
+            (
+                parse_complete(),
+                ready_for_query(),
+                parameter_description([type_oid("INTEGER")]),
+                row_description(columns),
+                bind_complete(),
+                ready_for_query(),
+                result(columns, [[b"42"] * NUM_COLUMNS] * num_rows),
+                ready_for_query(),
+            )
+        )
+
+    run_benchmark(
+        benchmark, con, lambda: con.execute_unnamed("SELECT", vals=(1,)), make_stream
+    )
@@ -0,0 +1,300 @@
+"""Builders for the messages that a PostgreSQL server sends, and a socket that serves
+them from memory, so that pg8000 can be driven without a server.
+"""
+
+from io import BufferedRWPair, BytesIO, RawIOBase
+
+from pg8000 import converters
+from pg8000.core import (
+    AUTHENTICATION_REQUEST,
+    BACKEND_KEY_DATA,
+    BIND_COMPLETE,
+    CLOSE_COMPLETE,
+    COMMAND_COMPLETE,
+    COPY_DATA,
+    COPY_DONE,
+    COPY_IN_RESPONSE,
+    COPY_OUT_RESPONSE,
+    CoreConnection,
+    DATA_ROW,
+    EMPTY_QUERY_RESPONSE,
+    ERROR_RESPONSE,
+    H_pack,
+    IDLE,
+    NO_DATA,
+    NULL_BYTE,
+    PARAMETER_DESCRIPTION,
+    PARAMETER_STATUS,
+    PARSE_COMPLETE,
+    READY_FOR_QUERY,
+    ROW_DESCRIPTION,
+    _create_message,
+    bh_pack,
+    i_pack,
+    ihihih_pack,
+)
+
+
+def authentication_ok():
+    return _create_message(AUTHENTICATION_REQUEST, i_pack(0))
+
+
+def authentication_request(auth_code, data=b""):
+    return _create_message(AUTHENTICATION_REQUEST, i_pack(auth_code) + data)
+
+
+def parameter_status(name, value):
+    return _create_message(
+        PARAMETER_STATUS, name.encode() + NULL_BYTE + value.encode() + NULL_BYTE
+    )
+
+
+def backend_key_data(pid, key):
+    return _create_message(BACKEND_KEY_DATA, i_pack(pid) + i_pack(key))
+
+
+def ready_for_query(status=IDLE):
+    return _create_message(READY_FOR_QUERY, status)
+
+
+def parse_complete():
+    return _create_message(PARSE_COMPLETE)
+
+
+def bind_complete():
+    return _create_message(BIND_COMPLETE)
+
+
+def close_complete():
+    return _create_message(CLOSE_COMPLETE)
+
+
+def no_data():
+    return _create_message(NO_DATA)
+
+
+def empty_query_response():
+    return _create_message(EMPTY_QUERY_RESPONSE)
+
+
+def error_response(code, message, severity="ERROR"):
+    fields = {"S": severity, "V": severity, "C": code, "M": message}
+    return _create_message(
+        ERROR_RESPONSE,
+        b"".join(k.encode() + v.encode() + NULL_BYTE for k, v in fields.items())
+        + NULL_BYTE,
+    )
+
+
+def copy_in_response():
+    return _create_message(COPY_IN_RESPONSE, bh_pack(0, 0))
+
+
+def copy_out_response():
+    return _create_message(COPY_OUT_RESPONSE, bh_pack(0, 0))
+
+
+def copy_data(data):
+    return _create_message(COPY_DATA, data)
+
+
+def copy_done():
+    return _create_message(COPY_DONE)
+
+
+def parameter_description(oids):
+    return _create_message(
+        PARAMETER_DESCRIPTION, H_pack(len(oids)) + b"".join(i_pack(o) for o in oids)
+    )
+
+
+def row_description(columns):
+    """The columns are a sequence of (name, type_oid) pairs."""
+    data = bytearray(H_pack(len(columns)))
+    for name, type_oid in columns:
+        data.extend(name.encode() + NULL_BYTE + ihihih_pack(0, 0, type_oid, -1, -1, 0))
+    return _create_message(ROW_DESCRIPTION, bytes(data))
+
+
+def data_row(values):
+    """The values are in the text format, as bytes, or None for NULL."""
+    data = bytearray(H_pack(len(values)))
+    for v in values:
+        if v is None:
+            data.extend(i_pack(-1))
+        else:
+            data.extend(i_pack(len(v)))
+            data.extend(v)
+    return _create_message(DATA_ROW, bytes(data))
+
+
+def command_complete(tag):
+    return _create_message(COMMAND_COMPLETE, tag.encode() + NULL_BYTE)
+
+
+def result(columns, rows):
+    """The messages for the result of a SELECT, not including the ReadyForQuery."""
+    return b"".join(
+        (
+            row_description(columns),
+            b"".join(data_row(row) for row in rows),
+            command_complete(f"SELECT {len(rows)}"),
+        )
+    )
+
+
+class _Replay(RawIOBase):
+    def __init__(self):
+        self.load(b"")
+
+    def load(self, data):
+        self._data = memoryview(data)
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), len(self._data) - self._pos)
+        b[:n] = self._data[self._pos : self._pos + n]
+        self._pos += n
+        return n
+
+
+class _Sink(RawIOBase):
+    def __init__(self):
+        self.sent = BytesIO()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        return self.sent.write(b)
+
+
+class MemorySocket:
+    """A socket that serves the bytes that it's loaded with, and keeps the bytes that
+    are written to it in ``sent``, a ``BytesIO``.
+    """
+
+    def __init__(self, data=b""):
+        self._reader = _Replay()
+        self._writer = _Sink()
+        self.sent = self._writer.sent
+        self.load(data)
+
+    def load(self, data):
+        """Sets the bytes to be served, for example a recorded or synthetic stream of
+        messages. Any bytes not yet read are discarded.
+        """
+        self._reader.load(data)
+
+    def makefile(self, mode):
+        return BufferedRWPair(self._reader, self._writer)
+
+    def close(self):
+        pass
+
+
+def connect():
+    """Returns a CoreConnection that's connected to a MemorySocket."""
+    sock = MemorySocket(
+        authentication_ok()
+        + parameter_status("client_encoding", "UTF8")
+        + parameter_status("server_version", "16.2")
+        + backend_key_data(1, 2)
+        + ready_for_query()
+    )
+    return CoreConnection("postgres", sock=sock, ssl_context=False)
+
+
+# A value in the text format for each type in PG_TYPES, keyed by the name of the type
+# in pg8000.converters
+TEXT_VALUES = {
+    "BIGINT": "9223372036854775807",
+    "BIGINT_ARRAY": "{1,-2,3000000000,NULL}",
+    "BOOLEAN": "t",
+    "BOOLEAN_ARRAY": "{t,f,t}",
+    "BYTES": "\\x0102deadbeef",
+    "BYTES_ARRAY": '{"\\\\x0102","\\\\xdeadbeef"}',
+    "CHAR": "a",
+    "CHAR_ARRAY": "{a,b,c}",
+    "CIDR_ARRAY": "{192.168.100.128/25,10.0.0.0/8}",
+    "CSTRING": "Conquest of Bread",
+    "CSTRING_ARRAY": "{Conquest,Bread}",
+    "DATE": "2024-03-31",
+    "DATE_ARRAY": "{2024-03-31,2024-04-01}",
+    "DATEMULTIRANGE": "{[2024-01-01,2024-02-01),[2024-03-01,2024-04-01)}",
+    "DATEMULTIRANGE_ARRAY": '{"{[2024-01-01,2024-02-01)}","{[2024-03-01,2024-04-01)}"}',
+    "DATERANGE": "[2024-01-01,2024-02-01)",
+    "DATERANGE_ARRAY": '{"[2024-01-01,2024-02-01)","[2024-03-01,2024-04-01)"}',
+    "FLOAT": "3.141592653589793",
+    "FLOAT_ARRAY": "{1.5,2.25,-3}",
+    "INET": "192.168.0.1",
+    "INET_ARRAY": "{192.168.0.1,::1}",
+    "INT4MULTIRANGE": "{[1,5),[10,20)}",
+    "INT4MULTIRANGE_ARRAY": '{"{[1,5),[10,20)}","{[30,40)}"}',
+    "INT4RANGE": "[1,10)",
+    "INT4RANGE_ARRAY": '{"[1,10)","[20,30)"}',
+    "INT8MULTIRANGE": "{[1,5),[3000000000,4000000000)}",
+    "INT8MULTIRANGE_ARRAY": '{"{[1,5)}","{[3000000000,4000000000)}"}',
+    "INT8RANGE": "[1,3000000000)",
+    "INT8RANGE_ARRAY": '{"[1,10)","[20,3000000000)"}',
+    "INTEGER": "2147483647",
+    "INTEGER_ARRAY": "{1,2,3,NULL}",
+    "JSON": '{"name": "Erich Fromm", "books": [1941, 1956], "living": false}',
+    "JSON_ARRAY": '{"{\\"a\\": 1}","[1, 2]"}',
+    "JSONB": '{"books": [1941, 1956], "name": "Erich Fromm", "living": false}',
+    "JSONB_ARRAY": '{"{\\"a\\": 1}","[1, 2]"}',
+    "MACADDR": "08:00:2b:01:02:03",
+    "MONEY": "$1,234.56",
+    "MONEY_ARRAY": "{$1.00,$2.50}",
+    "NAME": "pg_type",
+    "NAME_ARRAY": "{pg_type,pg_class}",
+    "NUMERIC": "12345.6789",
+    "NUMERIC_ARRAY": "{1.1,-2.25,NULL}",
+    "NUMRANGE": "[1.5,2.5)",
+    "NUMRANGE_ARRAY": '{"[1.5,2.5)","[3,4)"}',
+    "NUMMULTIRANGE": "{[1.5,2.5),[3,4)}",
+    "NUMMULTIRANGE_ARRAY": '{"{[1.5,2.5)}","{[3,4)}"}',
+    "OID": "1259",
+    "POINT": "(1.5,-2.5)",
+    "INTERVAL": "1 year 2 mons 3 days 04:05:06.789",
+    "INTERVAL_ARRAY": '{"1 day","02:00:00"}',
+    "REAL": "3.14",
+    "REAL_ARRAY": "{1.5,2.5}",
+    "RECORD": "(1,Erich,t)",
+    "SMALLINT": "32767",
+    "SMALLINT_ARRAY": "{1,2,-3}",
+    "SMALLINT_VECTOR": "1 2 3",
+    "TEXT": "The Fear of Freedom",
+    "TEXT_ARRAY": '{"The Fear of Freedom",Escape}',
+    "TIME": "04:05:06.789",
+    "TIME_ARRAY": "{04:05:06,23:59:59.999999}",
+    "TIMESTAMP": "2024-03-31 04:05:06.789",
+    "TIMESTAMP_ARRAY": '{"2024-03-31 04:05:06","2024-04-01 00:00:00"}',
+    "TIMESTAMPTZ": "2024-03-31 04:05:06.789+00",
+    "TIMESTAMPTZ_ARRAY": '{"2024-03-31 04:05:06+00","2024-04-01 00:00:00+02"}',
+    "TSMULTIRANGE": '{["2024-01-01 00:00:00","2024-02-01 00:00:00")}',
+    "TSMULTIRANGE_ARRAY": '{"{[\\"2024-01-01 00:00:00\\",\\"2024-02-01 00:00:00\\")}"}',
+    "TSRANGE": '["2024-01-01 00:00:00","2024-02-01 00:00:00")',
+    "TSRANGE_ARRAY": '{"[\\"2024-01-01 00:00:00\\",\\"2024-02-01 00:00:00\\")"}',
+    "TSTZMULTIRANGE": '{["2024-01-01 00:00:00+00","2024-02-01 00:00:00+00")}',
+    "TSTZMULTIRANGE_ARRAY": (
+        '{"{[\\"2024-01-01 00:00:00+00\\",\\"2024-02-01 00:00:00+00\\")}"}'
+    ),
+    "TSTZRANGE": '["2024-01-01 00:00:00+00","2024-02-01 00:00:00+00")',
+    "TSTZRANGE_ARRAY": (
+        '{"[\\"2024-01-01 00:00:00+00\\",\\"2024-02-01 00:00:00+00\\")"}'
+    ),
+    "UNKNOWN": "unknown",
+    "UUID_ARRAY": "{911460f2-1f43-fea2-3e2c-e01fd5b5069d,NULL}",
+    "UUID_TYPE": "911460f2-1f43-fea2-3e2c-e01fd5b5069d",
+    "VARCHAR": "Man for Himself",
+    "VARCHAR_ARRAY": '{"Man for Himself",NULL}',
+    "XID": "1234",
+}
+
+
+def type_oid(name):
+    return getattr(converters, name)